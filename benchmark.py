@@ -1,18 +1,30 @@
 import json
+import math
+import multiprocessing
+import os
+import signal
 import sys
 import time
-import statistics
+from collections import defaultdict
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from typing import List, Optional
+import numpy as np
 from src.core.map_loader import MapLoader
 from src.core.search_engine import SearchEngine
 from src.algorithms.algorithm_mapper import AlgorithmMapper
 from src.heuristics.heuristic_mapper import HeuristicMapper
 from src.core.result import SearchResult
+from src.core.state import SokobanState
 
 
-@dataclass
+# Plantillas precompiladas para las filas de la tabla detallada
+_ROW_FMT = "{:<12} {:<15} {:<8.1%} {}{:<4.2f} {:<8.3f} {:<8} {:<12} {:<6.1f} {:<8.0f} {:<8.0f}".format
+_RANGE_FMT = "{:.2f}-{:.2f}s".format
+_STD_FMT = "{:.3f}".format
+
+
+@dataclass(slots=True, frozen=True)
 class BenchmarkMetrics:
     """Métricas promedio de múltiples ejecuciones"""
     algorithm: str                    # Nombre del algoritmo
@@ -23,14 +35,14 @@ class BenchmarkMetrics:
     avg_nodes_expanded: float        # Promedio de nodos expandidos de ejecuciones exitosas
     avg_max_frontier_size: float     # Promedio del tamaño máximo de frontera de ejecuciones exitosas
     avg_processing_time: float       # Promedio de tiempo de procesamiento de ejecuciones exitosas
-    std_processing_time: float       # Desviación estándar de tiempo (float('inf') si solo 1 muestra)
+    std_processing_time: Optional[float]  # Desviación estándar de tiempo (None si solo 1 muestra)
     success_rate: float              # successful_runs / total_runs (0.0 - 1.0)
     min_processing_time: float       # Tiempo mínimo observado en ejecuciones exitosas
     max_processing_time: float       # Tiempo máximo observado en ejecuciones exitosas
     confidence_score: float          # Score 0-1: 50% success_rate + 30% samples + 20% consistency
 
 
-@dataclass
+@dataclass(slots=True)
 class BenchmarkConfig:
     """Configuración del benchmark"""
     map_name: str
@@ -40,10 +52,70 @@ class BenchmarkConfig:
     pruning: bool
 
 
+# Estado inicial del mapa y límite por ejecución, fijados una vez por proceso worker (ver _worker_init)
+_WORKER_STATE: Optional[SokobanState] = None
+_WORKER_TIMEOUT: float = 0.0
+
+
+class _RunTimeout(Exception):
+    """Una ejecución superó el timeout por ejecución"""
+
+
+def _on_run_timeout(signum, frame):
+    raise _RunTimeout()
+
+
+def _worker_init(map_name: str, timeout_seconds: float, pid_queue):
+    """Carga el mapa en el worker para no serializarlo en cada ejecución, arma el
+    timeout por ejecución y registra su pid para poder terminarlo si vence el deadline global"""
+    global _WORKER_STATE, _WORKER_TIMEOUT
+    _WORKER_STATE = MapLoader.load_from_file(map_name)
+    _WORKER_TIMEOUT = timeout_seconds
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _on_run_timeout)
+    pid_queue.put(os.getpid())
+
+
+def _run_single_algorithm(algorithm_type, heuristic_type, pruning: bool, run_id: int) -> Optional[SearchResult]:
+    """Ejecuta una sola prueba de algoritmo en un worker. Con SIGALRM (POSIX) la búsqueda se
+    corta al vencer el timeout por ejecución; si no, sólo la acota el deadline global del pool"""
+    use_alarm = hasattr(signal, "SIGALRM")
+    try:
+        algorithm = AlgorithmMapper.get_algorithm_by_type(algorithm_type)
+        heuristic = HeuristicMapper.get_heuristic_by_type(heuristic_type) if heuristic_type else None
+        
+        # Validar si el algoritmo necesita heurística
+        if algorithm.needs_heuristic() and heuristic is None:
+            return None
+        # La instancia es compartida en el worker: sin sus caches cada repetición mide lo mismo
+        if heuristic is not None:
+            heuristic.reset()
+        
+        # Usar metrics_only para ahorrar tiempo y memoria
+        engine = SearchEngine(algorithm, heuristic, pruning, metrics_only=True)
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, _WORKER_TIMEOUT)
+        try:
+            result = engine.search(_WORKER_STATE)
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        
+        return result if result.success else None
+        
+    except _RunTimeout:
+        # Timeout de la ejecución: cuenta como no exitosa
+        return None
+    except Exception as e:
+        print(f"Error in run {run_id}: {e}")
+        return None
+
+
 class BenchmarkRunner:
     def __init__(self, config_file: str):
         self.config = self._load_config(config_file)
-        self.initial_state = MapLoader.load_from_file(self.config.map_name)
+        # Validar el mapa antes de lanzar los workers (cada uno lo carga por su cuenta)
+        MapLoader.load_from_file(self.config.map_name)
         
     def _load_config(self, config_file: str) -> BenchmarkConfig:
         """Cargar configuración del benchmark"""
@@ -58,28 +130,8 @@ class BenchmarkRunner:
             pruning=config_data.get("pruning", False)
         )
     
-    def _run_single_algorithm(self, algorithm_type, heuristic_type, run_id: int) -> Optional[SearchResult]:
-        """Ejecuta una sola prueba de algoritmo (timeout manejado por ThreadPoolExecutor)"""
-        try:
-            algorithm = AlgorithmMapper.get_algorithm_by_type(algorithm_type)
-            heuristic = HeuristicMapper.get_heuristic_by_type(heuristic_type) if heuristic_type else None
-            
-            # Validar si el algoritmo necesita heurística
-            if algorithm.needs_heuristic() and heuristic is None:
-                return None
-            
-            # Usar metrics_only para ahorrar tiempo y memoria
-            engine = SearchEngine(algorithm, heuristic, self.config.pruning, metrics_only=True)
-            result = engine.search(self.initial_state)
-            
-            return result if result.success else None
-            
-        except Exception as e:
-            print(f"Error in run {run_id}: {e}")
-            return None
-    
     def _calculate_confidence_score(self, success_rate: float, successful_runs: int, 
-                                   std_time: float, avg_time: float) -> float:
+                                   std_time: Optional[float], avg_time: float) -> float:
         """
         Calcula score de confiabilidad (0-1) basado en múltiples factores
         
@@ -94,14 +146,12 @@ class BenchmarkRunner:
         success_factor = success_rate
         
         # Factor 2: Número de muestras exitosas (0-1) - Normalizado a 5 muestras máximo
-        sample_factor = min(successful_runs / 5.0, 1.0)
+        sample_factor = min(successful_runs * 0.2, 1.0)
         
         # Factor 3: Consistencia de tiempo (0-1) - Basado en coeficiente de variación
-        if std_time == float('inf') or avg_time == 0:
-            consistency_factor = 0.0  # Una sola muestra o tiempo cero = no consistencia
-        else:
-            cv = std_time / avg_time  # Coeficiente de variación = std/mean
-            consistency_factor = max(0.0, 1.0 - min(cv, 1.0))  # Invertir: menor CV = mejor
+        # Una sola muestra o tiempo cero = CV 1.0 = sin consistencia
+        cv = std_time / avg_time if (std_time is not None and avg_time > 0) else 1.0
+        consistency_factor = 1.0 - min(max(cv, 0.0), 1.0)  # Invertir: menor CV = mejor
         
         # Score ponderado final
         confidence = (
@@ -112,41 +162,12 @@ class BenchmarkRunner:
         
         return confidence
     
-    def _benchmark_combination(self, algorithm_type, heuristic_type) -> BenchmarkMetrics:
-        """Ejecuta múltiples pruebas para una combinación algoritmo-heurística"""
+    def _benchmark_combination(self, algorithm_type, heuristic_type,
+                               results: List[SearchResult]) -> BenchmarkMetrics:
+        """Calcula las métricas de una combinación algoritmo-heurística a partir de sus ejecuciones exitosas"""
         algo_name = algorithm_type.value
         heur_name = heuristic_type.value if heuristic_type else "None"
         
-        print(f"📊 Benchmarking {algo_name} + {heur_name} ({self.config.repetitions} runs)...")
-        
-        # Ejecutar tareas con threading y timeout
-        timeout_seconds = self.config.timeout_minutes * 60
-        with ProcessPoolExecutor(max_workers=self.config.max_threads) as executor:
-            # Enviar todas las tareas
-            futures = {
-                executor.submit(self._run_single_algorithm, algorithm_type, heuristic_type, i): i 
-                for i in range(self.config.repetitions)
-            }
-            
-            # Recoger resultados con timeout
-            results = []
-            completed = 0
-            
-            for future in as_completed(futures, timeout=timeout_seconds * self.config.repetitions):
-                completed += 1
-                try:
-                    result = future.result(timeout=timeout_seconds)
-                    if result:
-                        results.append(result)
-                except Exception:
-                    # Timeout o error en la ejecución
-                    pass
-                
-                # Progreso
-                print(f"  {completed:2d}/{self.config.repetitions} completed", end="\r")
-        
-        print()  # Nueva línea después del progreso
-        
         # Calcular estadísticas
         successful_runs = len(results)
         success_rate = successful_runs / self.config.repetitions
@@ -161,25 +182,27 @@ class BenchmarkRunner:
                 avg_nodes_expanded=0,
                 avg_max_frontier_size=0,
                 avg_processing_time=0,
-                std_processing_time=0,
+                std_processing_time=None,
                 success_rate=0.0,
                 min_processing_time=0,
                 max_processing_time=0,
                 confidence_score=0.0
             )
         
-        # Extraer métricas solo de ejecuciones exitosas (ignora timeouts/errores)
-        solution_costs = [r.solution_cost for r in results]        # Movimientos para llegar a la solución
-        nodes_expanded = [r.nodes_expanded for r in results]        # Nodos explorados por el algoritmo
-        max_frontier_sizes = [r.max_frontier_size for r in results] # Máximo tamaño de la frontera
-        processing_times = [r.processing_time for r in results]     # Tiempo real de ejecución
+        # Volcar métricas de ejecuciones exitosas a arrays (ignora timeouts/errores)
+        n = successful_runs
+        costs = np.fromiter((r.solution_cost for r in results), dtype=np.float64, count=n)       # Movimientos
+        nodes = np.fromiter((r.nodes_expanded for r in results), dtype=np.float64, count=n)      # Nodos expandidos
+        fronts = np.fromiter((r.max_frontier_size for r in results), dtype=np.float64, count=n)  # Frontera máxima
+        times = np.fromiter((r.processing_time for r in results), dtype=np.float64, count=n)     # Tiempo real
+        avg_t, min_t, max_t = float(times.mean()), float(times.min()), float(times.max())
         
-        # Calcular desviación estándar (float('inf') si solo hay 1 muestra)
-        std_time = statistics.stdev(processing_times) if len(processing_times) > 1 else float('inf')
+        # Calcular desviación estándar (None si solo hay 1 muestra)
+        std_time = float(times.std(ddof=1)) if n > 1 else None
         
         # Calcular score de confiabilidad combinando múltiples factores
         confidence_score = self._calculate_confidence_score(
-            success_rate, successful_runs, std_time, statistics.mean(processing_times)
+            success_rate, successful_runs, std_time, avg_t
         )
         
         return BenchmarkMetrics(
@@ -187,14 +210,14 @@ class BenchmarkRunner:
             heuristic=heur_name,
             successful_runs=successful_runs,                         # Contador de ejecuciones exitosas
             total_runs=self.config.repetitions,                     # Total configurado en el JSON
-            avg_solution_cost=statistics.mean(solution_costs),      # Promedio aritmético de movimientos
-            avg_nodes_expanded=statistics.mean(nodes_expanded),     # Promedio aritmético de nodos
-            avg_max_frontier_size=statistics.mean(max_frontier_sizes), # Promedio aritmético de frontera máx
-            avg_processing_time=statistics.mean(processing_times),  # Promedio aritmético de tiempo
+            avg_solution_cost=float(costs.mean()),                  # Promedio aritmético de movimientos
+            avg_nodes_expanded=float(nodes.mean()),                 # Promedio aritmético de nodos
+            avg_max_frontier_size=float(fronts.mean()),             # Promedio aritmético de frontera máx
+            avg_processing_time=avg_t,                              # Promedio aritmético de tiempo
             std_processing_time=std_time,                           # Desviación estándar de tiempo
             success_rate=success_rate,                              # successful_runs / total_runs
-            min_processing_time=min(processing_times),              # Tiempo mínimo de las exitosas
-            max_processing_time=max(processing_times),              # Tiempo máximo de las exitosas
+            min_processing_time=min_t,                              # Tiempo mínimo de las exitosas
+            max_processing_time=max_t,                              # Tiempo máximo de las exitosas
             confidence_score=confidence_score                       # Score calculado con fórmula ponderada
         )
     
@@ -203,17 +226,17 @@ class BenchmarkRunner:
         algorithms = AlgorithmMapper.get_all_algorithms()
         heuristics = HeuristicMapper.get_all_heuristics()
         
+        # Instanciar cada algoritmo una sola vez para consultar sus requirements
+        needs_h = {algo: AlgorithmMapper.get_algorithm_by_type(algo).needs_heuristic() for algo in algorithms}
+        
         # Generar solo combinaciones válidas
         combinations = []
         invalid_combinations = []
         
         for algo in algorithms:
             for heur in heuristics:
-                # Crear instancia temporal para verificar requirements
-                algo_instance = AlgorithmMapper.get_algorithm_by_type(algo)
-                
                 # Si el algoritmo necesita heurística pero no hay una, skip
-                if algo_instance.needs_heuristic() and heur is None:
+                if needs_h[algo] and heur is None:
                     invalid_combinations.append((algo, heur))
                     continue
                     
@@ -225,47 +248,115 @@ class BenchmarkRunner:
         print(f"\n🚀 Starting full benchmark...")
         print(f"Map: {self.config.map_name}")
         print(f"Repetitions per combination: {self.config.repetitions}")
-        print(f"Timeout per run: {self.config.timeout_minutes} minutes")
+        # Lista plana de ejecuciones (algoritmo, heurística, run_id) sobre un único pool
+        work = [(algo, heur, i) for algo, heur in combinations for i in range(self.config.repetitions)]
+        timeout_seconds = self.config.timeout_minutes * 60
+        # Deadline global: cada worker procesa a lo sumo ceil(total/workers) ejecuciones,
+        # más un timeout de margen. Sin SIGALRM es el único límite efectivo
+        waves = math.ceil(len(work) / self.config.max_threads)
+        deadline_seconds = timeout_seconds * (waves + 1)
+        
+        if hasattr(signal, "SIGALRM"):
+            print(f"Timeout per run: {self.config.timeout_minutes} minutes")
+        print(f"Global deadline: {deadline_seconds / 60:.1f} minutes")
         print(f"Max threads: {self.config.max_threads}")
         print(f"Valid combinations: {total_combinations}")
         if total_invalid > 0:
             print(f"Skipped invalid combinations: {total_invalid} (algorithms requiring heuristics)")
         print()  # Línea vacía
         
-        # Ejecutar todas las combinaciones en paralelo
+        results_by_combination = defaultdict(list)
+        completed_by_combination = defaultdict(int)
         all_metrics = []
         completed = 0
-        
-        with ProcessPoolExecutor(max_workers=self.config.max_threads) as executor:
-            # Enviar todas las combinaciones como tareas
+        runs_completed = 0
+        total_runs = len(work)
+        # Progreso con \r solo en terminal y a lo sumo a 10 Hz; en salidas redirigidas se omite
+        show_progress = sys.stdout.isatty()
+        last_progress = 0.0
+        
+        # Los workers anuncian su pid para poder terminarlos sin tocar el estado privado del pool
+        mp_context = multiprocessing.get_context()
+        pid_queue = mp_context.SimpleQueue()
+        executor = ProcessPoolExecutor(max_workers=self.config.max_threads, mp_context=mp_context,
+                                       initializer=_worker_init,
+                                       initargs=(self.config.map_name, timeout_seconds, pid_queue))
+        timed_out = False
+        try:
             future_to_combination = {
-                executor.submit(self._benchmark_combination, algo, heur): (algo, heur)
-                for algo, heur in combinations
+                executor.submit(_run_single_algorithm, algo, heur, self.config.pruning, i): (algo, heur)
+                for algo, heur, i in work
             }
             
-            # Recoger resultados conforme van completándose
-            for future in as_completed(future_to_combination):
+            try:
+                for future in as_completed(future_to_combination, timeout=deadline_seconds):
+                    combination = future_to_combination[future]
+                    try:
+                        result = future.result()
+                        if result:
+                            results_by_combination[combination].append(result)
+                    except Exception:
+                        # Error en la ejecución
+                        pass
+                    
+                    # Progreso
+                    runs_completed += 1
+                    if show_progress:
+                        now = time.monotonic()
+                        if now - last_progress >= 0.1 or runs_completed == total_runs:
+                            sys.stdout.write(f"  {runs_completed:3d}/{total_runs} runs completed\r")
+                            sys.stdout.flush()
+                            last_progress = now
+                    
+                    # Al completar todas las repeticiones de una combinación, reportarla
+                    completed_by_combination[combination] += 1
+                    if completed_by_combination[combination] == self.config.repetitions:
+                        completed += 1
+                        metrics = self._benchmark_combination(*combination, results_by_combination[combination])
+                        all_metrics.append(metrics)
+                        self._print_combination_progress(completed, total_combinations, metrics)
+            except TimeoutError:
+                timed_out = True
+        finally:
+            if timed_out:
+                # Sin context manager: su shutdown(wait=True) esperaría a los workers colgados.
+                # Se descartan las ejecuciones pendientes y se terminan los procesos en curso
+                executor.shutdown(wait=False, cancel_futures=True)
+                while not pid_queue.empty():
+                    try:
+                        os.kill(pid_queue.get(), signal.SIGTERM)
+                    except ProcessLookupError:
+                        pass
+            else:
+                executor.shutdown(wait=True)
+
+        if timed_out:
+            # Las ejecuciones sin terminar cuentan como timeout (no exitosas) en sus combinaciones
+            timed_out_runs = total_runs - runs_completed
+            print(f"\n⏰ Global timeout reached: {timed_out_runs} runs timed out")
+        
+        # Combinaciones con ejecuciones que no terminaron antes del deadline
+        for combination in combinations:
+            if completed_by_combination[combination] < self.config.repetitions:
                 completed += 1
-                algo_type, heur_type = future_to_combination[future]
-                algo_name = algo_type.value
-                heur_name = heur_type.value if heur_type else "None"
-                
-                metrics = future.result()
+                metrics = self._benchmark_combination(*combination, results_by_combination[combination])
                 all_metrics.append(metrics)
-                
-                # Mostrar progreso con resultado
-                progress = f"[{completed:2d}/{total_combinations}]"
-                if metrics.successful_runs > 0:
-                    result = f"✅ {algo_name} + {heur_name}: {metrics.success_rate:.1%} success, avg: {metrics.avg_processing_time:.3f}s"
-                else:
-                    result = f"❌ {algo_name} + {heur_name}: No successful runs"
-                
-                print(f"{progress} {result}")
+                self._print_combination_progress(completed, total_combinations, metrics)
         
         # Ordenar resultados por nombre de algoritmo y heurística para consistencia
         all_metrics.sort(key=lambda m: (m.algorithm, m.heuristic))
         return all_metrics
     
+    def _print_combination_progress(self, completed: int, total: int, metrics: BenchmarkMetrics):
+        """Muestra progreso con el resultado de una combinación"""
+        progress = f"[{completed:2d}/{total}]"
+        if metrics.successful_runs > 0:
+            result = f"✅ {metrics.algorithm} + {metrics.heuristic}: {metrics.success_rate:.1%} success, avg: {metrics.avg_processing_time:.3f}s"
+        else:
+            result = f"❌ {metrics.algorithm} + {metrics.heuristic}: No successful runs"
+        
+        print(f"{progress} {result}")
+    
     def print_results(self, all_metrics: List[BenchmarkMetrics]):
         """Imprime reporte final del benchmark con análisis estadísticamente robusto"""
         print("\n" + "="*110)
@@ -312,19 +403,24 @@ class BenchmarkRunner:
         print(header)
         print("-" * len(header))
         
+        rows = []
         for m in metrics:
             # Indicador de confiabilidad
             conf_icon = "🟢" if m.confidence_score >= 0.7 else "🟡" if m.confidence_score >= 0.4 else "🔴"
             
             # Formatear rango de tiempo
-            time_range = f"{m.min_processing_time:.2f}-{m.max_processing_time:.2f}s"
+            time_range = _RANGE_FMT(m.min_processing_time, m.max_processing_time)
             
             # Formatear desviación estándar
-            std_display = "N/A" if m.std_processing_time == float('inf') else f"{m.std_processing_time:.3f}"
+            std_display = "N/A" if m.std_processing_time is None else _STD_FMT(m.std_processing_time)
             
-            print(f"{m.algorithm:<12} {m.heuristic:<15} {m.success_rate:<8.1%} "
-                  f"{conf_icon}{m.confidence_score:<4.2f} {m.avg_processing_time:<8.3f} {std_display:<8} "
-                  f"{time_range:<12} {m.avg_solution_cost:<6.1f} {m.avg_nodes_expanded:<8.0f} {m.avg_max_frontier_size:<8.0f}")
+            rows.append(_ROW_FMT(m.algorithm, m.heuristic, m.success_rate,
+                                 conf_icon, m.confidence_score, m.avg_processing_time, std_display,
+                                 time_range, m.avg_solution_cost, m.avg_nodes_expanded, m.avg_max_frontier_size))
+        
+        # Una sola escritura para toda la tabla
+        if rows:
+            sys.stdout.write("\n".join(rows) + "\n")
     
     def _print_top_performers(self, metrics: List[BenchmarkMetrics]):
         """Imprime estadísticas destacadas"""
@@ -1,11 +1,7 @@
+import importlib
 from enum import Enum
-from typing import List
-from src.algorithms.astar import AStar
+from typing import Dict, List, Tuple, Type
 from src.core.interfaces import ISearchAlgorithm
-from src.algorithms.bfs import BFSAlgorithm
-from src.algorithms.dfs import DFS
-from src.algorithms.greedy import GreedyAlgorithm
-from src.algorithms.iddfs import IDDFS
 
 class AlgorithmType(Enum):
     BFS = "BFS"
@@ -15,22 +11,47 @@ class AlgorithmType(Enum):
     IDDFS = "IDDFS"
 
 
+# (módulo, clase) por algoritmo: el módulo se importa recién al primer uso
+_ALGORITHM_FACTORIES: Dict[AlgorithmType, Tuple[str, str]] = {
+    AlgorithmType.BFS: ("bfs", "BFSAlgorithm"),
+    AlgorithmType.DFS: ("dfs", "DFS"),
+    AlgorithmType.ASTAR: ("astar", "AStar"),
+    AlgorithmType.GREEDY: ("greedy", "GreedyAlgorithm"),
+    AlgorithmType.IDDFS: ("iddfs", "IDDFS"),
+}
+
+_CLASS_CACHE: Dict[Tuple[str, str], Type[ISearchAlgorithm]] = {}
+
+# Una instancia reutilizable por algoritmo; se vacía con reset() antes de entregarla.
+# No es thread-safe: el benchmark usa procesos, así que cada proceso tiene su propio pool
+# y cada búsqueda usa una sola instancia a la vez.
+_INSTANCE_POOL: Dict[AlgorithmType, ISearchAlgorithm] = {}
+
+
+def _lazy(module_name: str, class_name: str) -> Type[ISearchAlgorithm]:
+    """Importa y cachea la clase del algoritmo; las llamadas siguientes son un lookup"""
+    key = (module_name, class_name)
+    cls = _CLASS_CACHE.get(key)
+    if cls is None:
+        module = importlib.import_module(f"src.algorithms.{module_name}")
+        cls = _CLASS_CACHE[key] = getattr(module, class_name)
+    return cls
+
+
 class AlgorithmMapper:
 
     @staticmethod
     def get_algorithm_by_type(algorithm_type: AlgorithmType) -> ISearchAlgorithm:
-        if AlgorithmType.BFS == algorithm_type:
-            return BFSAlgorithm()
-        elif AlgorithmType.DFS == algorithm_type:
-            return DFS()
-        elif AlgorithmType.ASTAR == algorithm_type:
-            return AStar()
-        elif AlgorithmType.GREEDY == algorithm_type:
-            return GreedyAlgorithm()
-        elif AlgorithmType.IDDFS == algorithm_type:
-            return IDDFS()
-        else:
+        algorithm = _INSTANCE_POOL.get(algorithm_type)
+        if algorithm is not None:
+            algorithm.reset()
+            return algorithm
+        try:
+            module_name, class_name = _ALGORITHM_FACTORIES[algorithm_type]
+        except KeyError:
             raise ValueError(f"Algoritmo desconocido: {algorithm_type}")
+        algorithm = _INSTANCE_POOL[algorithm_type] = _lazy(module_name, class_name)()
+        return algorithm
 
     @staticmethod
     def from_string(algorithm_name: str) -> ISearchAlgorithm:
@@ -1,43 +1,67 @@
 import heapq
-import itertools
-import math
-from typing import Optional, Any
+from typing import Optional, Any, Callable
 
-from src.core.interfaces import ISearchAlgorithm, IHeuristic
+from src.core.interfaces import ISearchAlgorithm, IHeuristic, DEAD
+from src.core.state import SokobanState
 from src.core.state_node import StateNode
 
-
-def _eval_heuristic(h: IHeuristic | Any, node: StateNode) -> float:
-    """Evaluate heuristic on the node's state and return as float (may be inf)."""
-    state = node.state
-    if hasattr(h, "calculate"):
-        return float(h.calculate(state))
-
-    return float(h(state))
+# Heap keys pack (f, h, tie) into a single int: f and h are stored in
+# thousandths so fractional heuristics keep their ordering, and the tie
+# counter makes every key unique. The tie is also the node's index in the
+# side table, so the heap holds plain ints and never touches a node.
+_COST_SCALE = 1000
+_H_BITS = 32
+_TIE_BITS = 32
+_TIE_MASK = (1 << _TIE_BITS) - 1
 
 
 class AStar(ISearchAlgorithm):
     """A* search algorithm implementation using a priority queue"""
 
     def __init__(self) -> None:
-        # (f, h, tie, node) where f and h are floats to allow inf
-        self._pq: list[tuple[float, float, int, StateNode]] = []
-        self._tie = itertools.count()
+        # keys encoding f, then h, then insertion order (= node id)
+        self._pq: list[int] = []
+        self._tie = 0
+        # node id -> node; popped slots are released so nodes can be freed
+        self._id_to_node: list[Optional[StateNode]] = []
+        # h values are memoized by the heuristics themselves (per box layout)
+        self._h_owner: Optional[IHeuristic] = None
+        # Bound heuristic callable, resolved once per heuristic instance
+        self._h_fn: Optional[Callable[[SokobanState], Any]] = None
+        self.max_size = 0
 
     def add(self, node: StateNode, heuristic: Optional[IHeuristic] = None) -> None:
         if heuristic is None:
             raise ValueError("A* requires a heuristic")
 
+        if heuristic is not self._h_owner:
+            self._h_owner = heuristic
+            self._h_fn = heuristic.calculate if hasattr(heuristic, "calculate") else heuristic
+
         g = node.cost
-        h = _eval_heuristic(heuristic, node)
-        # infinite heuristic (deadlocks or pruned states)
-        if math.isinf(h):
+        h = float(self._h_fn(node.state))
+        # deadlocked or pruned states (DEAD sentinel, or inf from other heuristics)
+        if h >= DEAD:
             return
         f = g + h
-        heapq.heappush(self._pq, (f, h, next(self._tie), node))
+        tie = self._tie
+        self._tie = tie + 1
+        self._id_to_node.append(node)
+        key = (((int(f * _COST_SCALE) << _H_BITS) | int(h * _COST_SCALE)) << _TIE_BITS) | tie
+        heapq.heappush(self._pq, key)
+        if len(self._pq) > self.max_size:
+            self.max_size = len(self._pq)
 
     def get_next(self) -> StateNode:
-        _, _, _, node = heapq.heappop(self._pq)
+        node_id = heapq.heappop(self._pq) & _TIE_MASK
+        id_to_node = self._id_to_node
+        node = id_to_node[node_id]
+        if self._pq:
+            id_to_node[node_id] = None
+        else:
+            # empty frontier: no live ids remain, restart numbering
+            id_to_node.clear()
+            self._tie = 0
         return node
 
     def has_next(self) -> bool:
@@ -46,6 +70,14 @@ class AStar(ISearchAlgorithm):
     def should_cache_cost(self) -> bool:
         return True
 
+    def reset(self) -> None:
+        self._pq.clear()
+        self._tie = 0
+        self._id_to_node.clear()
+        self._h_owner = None
+        self._h_fn = None
+        self.max_size = 0
+
     def size(self) -> int:
         return len(self._pq)
 
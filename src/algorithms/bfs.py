@@ -8,15 +8,26 @@ class BFSAlgorithm(ISearchAlgorithm):
     
     def __init__(self):
         self._queue = deque()
+        self.max_size = 0
+        # Bind the C-level pop directly: saves a Python frame per expansion
+        self.get_next = self._queue.popleft
     
     def add(self, item, heuristic: Optional[IHeuristic] = None):
-        self._queue.append(item)
+        queue = self._queue
+        queue.append(item)
+        if len(queue) > self.max_size:
+            self.max_size = len(queue)
     
     def get_next(self):
         return self._queue.popleft()
     
     def has_next(self) -> bool:
-        return len(self._queue) > 0
+        return bool(self._queue)
+    
+    def reset(self) -> None:
+        # clear() conserva el deque, así que get_next sigue enlazado al mismo
+        self._queue.clear()
+        self.max_size = 0
     
     def size(self) -> int:
         return len(self._queue)
@@ -5,15 +5,26 @@ class DFS(ISearchAlgorithm):
     """Pure Depth-First Search"""
     def __init__(self):
         self._stack = []
+        self.max_size = 0
+        # Bind the C-level pop directly: saves a Python frame per expansion
+        self.get_next = self._stack.pop
 
     def add(self, item, heuristic=None):
-        self._stack.append(item)
+        stack = self._stack
+        stack.append(item)
+        if len(stack) > self.max_size:
+            self.max_size = len(stack)
 
     def get_next(self):
         return self._stack.pop()
 
     def has_next(self) -> bool:
-        return len(self._stack) > 0
+        return bool(self._stack)
+
+    def reset(self) -> None:
+        # clear() keeps the same list, so the bound get_next stays valid
+        self._stack.clear()
+        self.max_size = 0
 
     def size(self) -> int:
         return len(self._stack)
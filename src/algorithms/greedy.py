@@ -1,4 +1,4 @@
-
+import heapq
 from src.core.interfaces import ISearchAlgorithm, IHeuristic
 from src.core.state_node import StateNode
 
@@ -7,18 +7,29 @@ class GreedyAlgorithm(ISearchAlgorithm):
     """Breadth-First Search con estructura de datos integrada"""
     
     def __init__(self):
+        # heap de (h, orden de inserción, nodo): el contador desempata en FIFO y evita comparar nodos
         self._nodes = []
+        self._tie = 0
+        self.max_size = 0
     
     def add(self, item: StateNode, heuristic: IHeuristic):
-        self._nodes.append((heuristic.calculate(item.state), item))
-        self._nodes.sort(key=lambda x:x[0])
+        tie = self._tie
+        self._tie = tie + 1
+        heapq.heappush(self._nodes, (heuristic.calculate(item.state), tie, item))
+        if len(self._nodes) > self.max_size:
+            self.max_size = len(self._nodes)
     
     def get_next(self) -> StateNode:
-        return self._nodes.pop(0)[1]
+        return heapq.heappop(self._nodes)[2]
     
     def has_next(self) -> bool:
         return len(self._nodes) > 0
     
+    def reset(self) -> None:
+        self._nodes.clear()
+        self._tie = 0
+        self.max_size = 0
+    
     def size(self) -> int:
         return len(self._nodes)
     
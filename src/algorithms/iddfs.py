@@ -1,5 +1,5 @@
 from src.core.interfaces import ISearchAlgorithm
-from typing import Optional
+from typing import List, Optional
 from src.core.state_node import StateNode
 from src.core.interfaces import IHeuristic
 
@@ -13,40 +13,53 @@ class IDDFS(ISearchAlgorithm):
     def __init__(self):
         self._stack = []
         self._current_depth_limit = self._INITIAL_DEPTH_LIMIT
-        self._items_at_depth = {}
-        self._max_depth_reached = False
+        # Buckets indexados por profundidad para los nodos que superan el límite
+        self._items_at_depth: List[List[StateNode]] = []
+        self._min_overflow_depth = self._current_depth_limit + 1
+        self._total_overflow = 0
+        self.max_size = 0
 
     def add(self, item: StateNode, heuristic: Optional[IHeuristic] = None):
-        depth = self._get_node_depth(item)
+        depth = item.depth
         
         if depth <= self._current_depth_limit:
             self._stack.append(item)
         else:
-            if depth not in self._items_at_depth:
-                self._items_at_depth[depth] = []
-            self._items_at_depth[depth].append(item)
-            self._max_depth_reached = True
+            buckets = self._items_at_depth
+            if depth >= len(buckets):
+                buckets.extend([] for _ in range(depth + 1 - len(buckets)))
+            buckets[depth].append(item)
+            if depth < self._min_overflow_depth:
+                self._min_overflow_depth = depth
+            self._total_overflow += 1
+        size = len(self._stack) + self._total_overflow
+        if size > self.max_size:
+            self.max_size = size
     
     def get_next(self):
-        if self._stack:
-            return self._stack.pop()
-        
-        if self._max_depth_reached:
+        # Profundizar hasta que algún bucket diferido entre en el límite
+        while not self._stack and self._total_overflow > 0:
             self._increase_depth_limit()
             self._reload_items_for_current_depth()
-            if self._stack:
-                return self._stack.pop()
+        
+        if self._stack:
+            return self._stack.pop()
         
         return None
     
     def has_next(self) -> bool:
-        return len(self._stack) > 0 or self._max_depth_reached
+        return bool(self._stack) or self._total_overflow > 0
+    
+    def reset(self) -> None:
+        self._stack.clear()
+        self._current_depth_limit = self._INITIAL_DEPTH_LIMIT
+        self._items_at_depth.clear()
+        self._min_overflow_depth = self._current_depth_limit + 1
+        self._total_overflow = 0
+        self.max_size = 0
     
     def size(self) -> int:
-        total_size = len(self._stack)
-        for items_list in self._items_at_depth.values():
-            total_size += len(items_list)
-        return total_size
+        return len(self._stack) + self._total_overflow
     
     def needs_heuristic(self) -> bool:
         return False
@@ -57,20 +70,17 @@ class IDDFS(ISearchAlgorithm):
     def get_algorithm_type(self) -> str:
         return "IDDFS"
     
-    def _get_node_depth(self, node: 'StateNode') -> int:
-        depth = 0
-        current = node
-        while current.parent is not None:
-            depth += 1
-            current = current.parent
-        return depth
-    
     def _increase_depth_limit(self):
         self._current_depth_limit += self._DEPTH_INCREMENT
-        self._max_depth_reached = False
     
     def _reload_items_for_current_depth(self):
-        for depth in range(self._current_depth_limit + 1):
-            if depth in self._items_at_depth:
-                self._stack.extend(self._items_at_depth[depth])
-                del self._items_at_depth[depth]
\ No newline at end of file
+        # Solo se recorren los buckets entre la menor profundidad almacenada y el nuevo límite
+        buckets = self._items_at_depth
+        for depth in range(self._min_overflow_depth, min(self._current_depth_limit + 1, len(buckets))):
+            bucket = buckets[depth]
+            if bucket:
+                self._stack.extend(bucket)
+                self._total_overflow -= len(bucket)
+                bucket.clear()
+        # Lo que queda almacenado supera el límite actual
+        self._min_overflow_depth = self._current_depth_limit + 1
\ No newline at end of file
@@ -1,18 +1,45 @@
 import csv
 import time
 import os
-from typing import List, Tuple, Set
+import sys
+import re
+from collections import Counter
+from itertools import islice
+from typing import List, Optional, Tuple, Set
 from dataclasses import dataclass
+import numpy as np
 
 
 """ Animador de Sokoban by Claude """
 
-@dataclass
+# Coordenada "(fila,col)" tal como la escribe SearchResult en el CSV de animación
+_COORD_RE = re.compile(r'\((-?\d+),\s*(-?\d+)\)')
+
+# Código ASCII interno de cada tile en la grilla de render
+_CODES = {
+    'wall': ord('#'),
+    'player': ord('@'),
+    'box': ord('$'),
+    'goal': ord('.'),
+    'box_on_goal': ord('*'),
+    'space': ord(' '),
+}
+
+_HEADER = "🎬 ANIMACIÓN DE SOLUCIÓN SOKOBAN\n" + "=" * 50
+
+# Todas las barras de progreso posibles, indexadas por cantidad de celdas llenas
+_BAR_LENGTH = 30
+_BARS = ['█' * filled + '░' * (_BAR_LENGTH - filled) for filled in range(_BAR_LENGTH + 1)]
+
+
+@dataclass(slots=True)
 class AnimationFrame:
     step: int
     player_pos: Tuple[int, int]
     boxes: Set[Tuple[int, int]]
     action: str
+    boxes_sorted: Tuple[Tuple[int, int], ...] = ()  # Cajas ordenadas, calculadas una vez al cargar
+    boxes_packed: Optional[np.ndarray] = None  # Índices planos (fila*ancho + col) en la grilla renderizada
 
 
 class SokobanAnimator:
@@ -21,6 +48,8 @@ class SokobanAnimator:
         self.animation_file = animation_file
         self.frames = self._load_frames()
         self.walls, self.goals = self._load_map_info(map_file) if map_file else (set(), set())
+        # Los límites no cambian entre frames: calcularlos una sola vez
+        self._bounds = self._get_map_dimensions()
         
         # Configuración de visualización
         self.symbols = {
@@ -32,6 +61,13 @@ class SokobanAnimator:
             # 'player_on_goal': '+',
             'space': ' '
         }
+        
+        # Secuencia ANSI para limpiar pantalla sin lanzar un proceso por frame (None = usar 'cls')
+        self._clear_seq = "\x1b[H\x1b[2J" if os.name == 'posix' else None
+        
+        # Grilla base con paredes y objetivos; cada frame solo estampa jugador y cajas
+        self._template, self._box_layer, self._player_layer = self._build_template()
+        self._pack_frame_boxes()
     
     def _load_frames(self) -> List[AnimationFrame]:
         """Carga los frames desde el archivo CSV"""
@@ -41,26 +77,27 @@ class SokobanAnimator:
             raise FileNotFoundError(f"Archivo de animación no encontrado: {self.animation_file}")
         
         with open(self.animation_file, 'r') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return frames
+            step_i = header.index('step')
+            player_i = header.index('player_pos')
+            boxes_i = header.index('boxes_pos')
+            action_i = header.index('action')
+            
             for row in reader:
-                # Parsear posición del jugador: "(1,1)"
-                player_str = row['player_pos'].strip('()')
-                player_pos = tuple(map(int, player_str.split(',')))
-                
-                # Parsear posiciones de cajas: "(1,2);(3,4)"
-                boxes = set()
-                if row['boxes_pos'].strip():
-                    box_positions = row['boxes_pos'].split(';')
-                    for box_str in box_positions:
-                        if box_str.strip():
-                            box_coords = box_str.strip('()').split(',')
-                            boxes.add((int(box_coords[0]), int(box_coords[1])))
-                
+                if not row:
+                    continue
+                # Posición del jugador "(1,1)" y cajas "(1,2);(3,4)": una sola extracción por regex
+                player_r, player_c = _COORD_RE.search(row[player_i]).groups()
+                boxes = {(int(r), int(c)) for r, c in _COORD_RE.findall(row[boxes_i])}
                 frames.append(AnimationFrame(
-                    step=int(row['step']),
-                    player_pos=player_pos,
+                    step=int(row[step_i]),
+                    player_pos=(int(player_r), int(player_c)),
                     boxes=boxes,
-                    action=row['action']
+                    action=row[action_i],
+                    boxes_sorted=tuple(sorted(boxes))
                 ))
         
         return frames
@@ -127,37 +164,69 @@ class SokobanAnimator:
         
         return min_row, max_row, min_col, max_col
     
+    def _build_template(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Construye la grilla de bytes (con una columna final de saltos de línea) y las capas de cajas y jugador"""
+        min_row, max_row, min_col, max_col = self._bounds
+        shape = (max_row - min_row + 1, max_col - min_col + 2)
+        
+        wall_mask = np.zeros(shape, dtype=bool)
+        goal_mask = np.zeros(shape, dtype=bool)
+        for mask, positions in ((wall_mask, self.walls), (goal_mask, self.goals)):
+            if positions:
+                rows, cols = np.array(list(positions)).T
+                mask[rows - min_row, cols - min_col] = True
+        
+        template = np.full(shape, _CODES['space'], dtype=np.uint8)
+        template[goal_mask] = _CODES['goal']
+        template[wall_mask] = _CODES['wall']
+        template[:, -1] = ord('\n')
+        
+        # Código ya resuelto por celda para una caja o el jugador: las paredes tienen prioridad
+        box_layer = np.where(goal_mask, _CODES['box_on_goal'], _CODES['box']).astype(np.uint8)
+        box_layer[wall_mask] = _CODES['wall']
+        player_layer = np.where(wall_mask, _CODES['wall'], _CODES['player']).astype(np.uint8)
+        
+        # Traducción de códigos de un byte a los símbolos configurados (p.ej. '#' -> '█')
+        self._render_table = str.maketrans({chr(code): self.symbols[name] for name, code in _CODES.items()})
+        return template, box_layer, player_layer
+    
+    def _pack_frame_boxes(self):
+        """Codifica las cajas de todos los frames como índices planos sobre la grilla, en un único array (N, B)"""
+        if not self.frames:
+            return
+        min_row, min_col = self._bounds[0], self._bounds[2]
+        stride = self._template.shape[1]
+        n_boxes = len(self.frames[0].boxes_sorted)
+        
+        if all(len(frame.boxes_sorted) == n_boxes for frame in self.frames):
+            coords = np.array([frame.boxes_sorted for frame in self.frames], dtype=np.intp)
+            coords = coords.reshape(len(self.frames), n_boxes, 2)
+            packed = (coords[:, :, 0] - min_row) * stride + (coords[:, :, 1] - min_col)
+            # Cada frame referencia su fila del array (vista, sin copia)
+            for frame, row in zip(self.frames, packed):
+                frame.boxes_packed = row
+        else:
+            # Cantidad de cajas variable entre frames: un array por frame
+            for frame in self.frames:
+                frame.boxes_packed = np.fromiter(
+                    ((r - min_row) * stride + (c - min_col) for r, c in frame.boxes_sorted),
+                    dtype=np.intp, count=len(frame.boxes_sorted)
+                )
+    
     def _render_frame(self, frame: AnimationFrame) -> str:
         """Renderiza un frame como string"""
-        min_row, max_row, min_col, max_col = self._get_map_dimensions()
-        
-        lines = []
-        for row in range(min_row, max_row + 1):
-            line = []
-            for col in range(min_col, max_col + 1):
-                pos = (row, col)
-                
-                if pos in self.walls:
-                    line.append(self.symbols['wall'])
-                elif pos == frame.player_pos:
-                    if pos in self.goals:
-                        #line.append(self.symbols['player_on_goal'])
-                        line.append(self.symbols['player'])
-                    else:
-                        line.append(self.symbols['player'])
-                elif pos in frame.boxes:
-                    if pos in self.goals:
-                        line.append(self.symbols['box_on_goal'])
-                    else:
-                        line.append(self.symbols['box'])
-                elif pos in self.goals:
-                    line.append(self.symbols['goal'])
-                else:
-                    line.append(self.symbols['space'])
-            
-            lines.append(''.join(line))
+        min_row, min_col = self._bounds[0], self._bounds[2]
+        grid = self._template.copy()
+        
+        boxes = frame.boxes_packed
+        grid.flat[boxes] = self._box_layer.flat[boxes]
+        
+        # El jugador se dibuja sobre cajas y objetivos, nunca sobre paredes
+        player = (frame.player_pos[0] - min_row, frame.player_pos[1] - min_col)
+        grid[player] = self._player_layer[player]
         
-        return '\n'.join(lines)
+        # Un único volcado de bytes (sin el '\n' final) y una traducción en C
+        return grid.tobytes()[:-1].decode('ascii').translate(self._render_table)
     
     def play(self, speed: float = 1.0, auto_play: bool = True):
         """Reproduce la animación"""
@@ -165,8 +234,7 @@ class SokobanAnimator:
             print("❌ No hay frames para reproducir")
             return
         
-        print("🎬 ANIMACIÓN DE SOLUCIÓN SOKOBAN")
-        print("=" * 50)
+        print(_HEADER)
         print(f"📊 Total de pasos: {len(self.frames)}")
         print(f"⏱️  Velocidad: {speed}x")
         
@@ -175,38 +243,47 @@ class SokobanAnimator:
         
         print("\n" + "=" * 50)
         
+        # Locales para el loop de reproducción
+        n = len(self.frames)
+        last = n - 1
+        delay = 1.0 / speed if auto_play else 0.0
+        sleep = time.sleep
+        render = self._render_frame
+        clear_seq = self._clear_seq
+        write, flush = sys.stdout.write, sys.stdout.flush
+        
         for i, frame in enumerate(self.frames):
             # Limpiar pantalla
-            os.system('clear' if os.name == 'posix' else 'cls')
+            if clear_seq is not None:
+                write(clear_seq)
+                flush()
+            else:
+                os.system('cls')
             
             # Mostrar header
-            print("🎬 ANIMACIÓN DE SOLUCIÓN SOKOBAN")
-            print("=" * 50)
+            print(_HEADER)
             
             # Mostrar información del paso
-            print(f"📍 Paso {frame.step + 1}/{len(self.frames)}")
+            print(f"📍 Paso {frame.step + 1}/{n}")
             print(f"🎯 Acción: {frame.action}")
             print(f"👤 Jugador: {frame.player_pos}")
-            print(f"📦 Cajas: {sorted(list(frame.boxes))}")
+            print(f"📦 Cajas: {list(frame.boxes_sorted)}")
             print()
             
             # Mostrar mapa
-            print(self._render_frame(frame))
+            print(render(frame))
             print()
             
             # Mostrar barra de progreso
-            progress = (i + 1) / len(self.frames)
-            bar_length = 30
-            filled_length = int(bar_length * progress)
-            bar = '█' * filled_length + '░' * (bar_length - filled_length)
-            print(f"Progreso: [{bar}] {progress:.1%}")
+            progress = (i + 1) / n
+            print(f"Progreso: [{_BARS[int(_BAR_LENGTH * progress)]}] {progress:.1%}")
             
             # Control de reproducción
             if auto_play:
-                if i < len(self.frames) - 1:  # No esperar en el último frame
-                    time.sleep(1.0 / speed)
+                if i < last:  # No esperar en el último frame
+                    sleep(delay)
             else:
-                if i < len(self.frames) - 1:
+                if i < last:
                     user_input = input("\nPulsa ENTER para continuar, 'q' para salir: ")
                     if user_input.lower() == 'q':
                         break
@@ -224,18 +301,15 @@ class SokobanAnimator:
         print(f"📊 Total de pasos: {len(self.frames)}")
         print(f"🎯 Acciones realizadas:")
         
-        actions = [frame.action for frame in self.frames[1:]]
-        action_counts = {}
-        for action in actions:
-            action_counts[action] = action_counts.get(action, 0) + 1
+        action_counts = Counter(frame.action for frame in islice(self.frames, 1, None))
         
-        for action, count in action_counts.items():
+        for action, count in action_counts.most_common():
             print(f"  • {action}: {count} vez(es)")
         
         print(f"\n🏁 Estado final:")
         final_frame = self.frames[-1]
         print(f"  👤 Jugador: {final_frame.player_pos}")
-        print(f"  📦 Cajas: {sorted(list(final_frame.boxes))}")
+        print(f"  📦 Cajas: {list(final_frame.boxes_sorted)}")
 
 
 def main():
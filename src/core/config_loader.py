@@ -1,11 +1,19 @@
 import json
 import os
 import time
+from functools import lru_cache
 from src.core.interfaces import ISearchAlgorithm
 from src.algorithms.algorithm_mapper import AlgorithmMapper
 from src.heuristics.heuristic_mapper import HeuristicMapper
 
 
+@lru_cache(maxsize=None)
+def _read_config(config_path: str, mtime: float) -> dict:
+    """Lee y parsea el JSON; mtime forma parte de la clave para invalidar si el archivo cambia"""
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+
 class ConfigLoader:
     """Carga y valida configuración desde archivos JSON"""
     
@@ -21,8 +29,8 @@ class ConfigLoader:
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Config file '{config_path}' is missing.")
 
-        with open(config_path, "r") as f:
-            config = json.load(f)
+        # Dict compartido entre llamadas: solo lectura
+        config = _read_config(config_path, os.path.getmtime(config_path))
 
         # Cargar configuración con valores por defecto
         self.algorithm: ISearchAlgorithm = AlgorithmMapper.from_string(
@@ -1,7 +1,16 @@
 from typing import Optional, TYPE_CHECKING
 from abc import ABC, abstractmethod
 if TYPE_CHECKING:
-    from src.core.state import SokobanState, StateNode
+    from src.core.state import SokobanState
+    from src.core.state_node import StateNode
+
+
+# Valor de heurística para estados sin solución (deadlock). Es un int para que f siga
+# siendo entero; los algoritmos descartan todo h >= DEAD (también inf)
+DEAD: int = 10 ** 9
+
+# Tope de entradas de los caches de h por configuración de cajas (al llenarse se vacían)
+H_CACHE_SIZE: int = 1 << 18
 
 
 class IHeuristic(ABC):
@@ -9,10 +18,17 @@ class IHeuristic(ABC):
     def calculate(self, state: 'SokobanState') -> int:
         raise NotImplementedError("This method should be overridden")
 
+    def reset(self) -> None:
+        """Descarta los caches internos (tablas por tablero, valores de h memorizados)"""
+        return
+
 
 class ISearchAlgorithm(ABC):
     """Interfaz unificada que combina estructura de datos y lógica del algoritmo"""
 
+    # Tamaño máximo que alcanzó la frontera desde el último reset(); lo actualiza add()
+    max_size: int = 0
+
     @abstractmethod
     def add(self, item: 'StateNode', heuristic: Optional[IHeuristic] = None):
         """Agrega un item a la frontera. La heurística es opcional."""
@@ -28,6 +44,11 @@ class ISearchAlgorithm(ABC):
         """Verifica si la frontera tiene más elementos"""
         raise NotImplementedError("This method should be overridden")
 
+    @abstractmethod
+    def reset(self) -> None:
+        """Vacía la frontera y el estado interno para reutilizar la instancia en otra búsqueda"""
+        raise NotImplementedError("This method should be overridden")
+
     @abstractmethod
     def size(self) -> int:
         """Retorna el tamaño actual de la frontera"""
@@ -1,6 +1,7 @@
 from enum import Enum
-from typing import List
-from src.core.state import SokobanState
+from typing import List, Set, Tuple
+import numpy as np
+from src.core.state import Board, SokobanState
 
 class TileType(Enum):
     WALL = '#'
@@ -11,6 +12,19 @@ class TileType(Enum):
     BOX_ON_GOAL = '*'
     PLAYER_ON_GOAL = '+'
 
+_WALL = [ord(TileType.WALL.value)]
+_BOXES = [ord(TileType.BOX.value), ord(TileType.BOX_ON_GOAL.value)]
+_GOALS = [ord(TileType.GOAL.value), ord(TileType.BOX_ON_GOAL.value), ord(TileType.PLAYER_ON_GOAL.value)]
+_PLAYERS = [ord(TileType.PLAYER.value), ord(TileType.PLAYER_ON_GOAL.value)]
+_TILE_CODES = [ord(tile.value) for tile in TileType]
+
+
+def _positions(grid: np.ndarray, codes: List[int]) -> Set[Tuple[int, int]]:
+    """(row, col) of every cell whose character is one of codes"""
+    rows, cols = np.nonzero(np.isin(grid, codes))
+    return set(zip(rows.tolist(), cols.tolist()))
+
+
 class MapLoader:
     """Loads Sokoban maps from strings or files"""
 
@@ -24,33 +38,28 @@ class MapLoader:
     @staticmethod
     def _parse_lines(lines: List[str]) -> SokobanState:
         """Parses map lines and creates SokobanState"""
-        walls = set()
-        boxes = set()
-        goals = set()
         player_pos = None
-        
-        for row, line in enumerate(lines):
-            for col, char in enumerate(line):
-                pos = (row, col)
+        walls, boxes, goals = set(), set(), set()
+
+        width = max((len(line) for line in lines), default=0)
+        if width:
+            # One code point per cell (UTF-32 keeps any character addressable), padded with spaces
+            grid = np.frombuffer(
+                "".join(line.ljust(width) for line in lines).encode("utf-32-le"), dtype="<u4"
+            ).reshape(len(lines), width)
+
+            unknown = ~np.isin(grid, _TILE_CODES)
+            if unknown.any():
+                row, col = np.argwhere(unknown)[0]
+                raise ValueError(f"Unknown character '{lines[row][col]}' in map")
 
-                if char == TileType.WALL.value:
-                    walls.add(pos)
-                elif char == TileType.PLAYER.value:
-                    player_pos = pos
-                elif char == TileType.PLAYER_ON_GOAL.value:
-                    player_pos = pos
-                    goals.add(pos)
-                elif char == TileType.BOX.value:
-                    boxes.add(pos)
-                elif char == TileType.BOX_ON_GOAL.value:
-                    boxes.add(pos)
-                    goals.add(pos)
-                elif char == TileType.GOAL.value:
-                    goals.add(pos)
-                elif char == TileType.SPACE.value:
-                    continue
-                else:
-                    raise ValueError(f"Unknown character '{char}' in map")
+            walls = _positions(grid, _WALL)
+            boxes = _positions(grid, _BOXES)
+            goals = _positions(grid, _GOALS)
+            players = np.argwhere(np.isin(grid, _PLAYERS))
+            if len(players):
+                # Row-major scan order: the last player tile wins
+                player_pos = (int(players[-1][0]), int(players[-1][1]))
         
         if player_pos is None:
             raise ValueError(f"Player ({TileType.PLAYER}) not found in map")
@@ -67,6 +76,5 @@ class MapLoader:
         return SokobanState(
             player_pos=player_pos,
             boxes=boxes,
-            walls=frozenset(walls),
-            goals=frozenset(goals)
+            board=Board.for_level(frozenset(walls), frozenset(goals))
         )
\ No newline at end of file
@@ -2,11 +2,15 @@ from typing import List
 import json
 from dataclasses import dataclass
 from src.core.state import SokobanState
-import csv
 from src.core.utils import handle_file_path, ResultFileType, OutputFormat
 
+# "(row,col)" as read back by the animator
+_COORD_FMT = "({0[0]},{0[1]})".format
+# step,"player_pos","boxes_pos",action
+_ROW_FMT = '{},"{}","{}",{}\r\n'.format
 
-@dataclass
+
+@dataclass(slots=True)
 class SearchResult:
     success: bool
     states_path: List[SokobanState]
@@ -86,7 +90,8 @@ class SearchResult:
 
         metric_file_path = handle_file_path(ResultFileType.METRICS, OutputFormat.JSON, filename)
         with open(metric_file_path, 'w') as f:
-            json.dump(solution_data, f, indent=2)
+            # Una sola escritura en vez de un write por token
+            f.write(json.dumps(solution_data, indent=2))
 
         if generate_animation_file:
             self._extract_states_for_animation(filename)
@@ -114,18 +119,18 @@ class SearchResult:
 
     def _extract_states_for_animation(self, file_name: str = None) -> None:
         file_path = handle_file_path(ResultFileType.ANIMATION, OutputFormat.CSV, file_name)
-        headers = ["step", "player_pos", "boxes_pos", "action"]
-
-        with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(headers)
+        n_actions = len(self.actions_path)
 
-            for i, state in enumerate(self.states_path):
-                boxes_str = ";".join([f"({r},{c})" for r, c in sorted(list(state.boxes))])
-                player_str = f"({state.player_pos[0]},{state.player_pos[1]})"
-                writer.writerow([
+        # Same bytes csv.writer would produce (QUOTE_MINIMAL, \r\n): coordinates contain
+        # commas so they are always quoted, actions never need quoting.
+        with open(file_path, mode='wb', buffering=1 << 20) as file:
+            file.write(b"step,player_pos,boxes_pos,action\r\n")
+            file.writelines(
+                _ROW_FMT(
                     i,
-                    player_str,
-                    boxes_str,
-                    self.actions_path[i] if i < len(self.actions_path) else ("START" if i == 0 else "")
-                ])
+                    _COORD_FMT(state.player_pos),
+                    ";".join(map(_COORD_FMT, sorted(state.boxes_iter()))),
+                    self.actions_path[i] if i < n_actions else ("START" if i == 0 else "")
+                ).encode()
+                for i, state in enumerate(self.states_path)
+            )
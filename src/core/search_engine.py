@@ -8,13 +8,18 @@ import src.core as core
 
 
 def _reconstruct_path_from_node(goal_node: StateNode) -> Tuple[List[SokobanState], List[str]]:
-    states, actions = [], []
+    # depth gives the path length up front: fill both lists from the tail, no reversal copy
+    n = goal_node.depth + 1
+    states: List[SokobanState] = [None] * n
+    actions: List[str] = [None] * n
+    i = n - 1
     while goal_node:
-        states.append(goal_node.state)
-        actions.append(goal_node.action)
+        states[i] = goal_node.state
+        actions[i] = goal_node.action
+        i -= 1
         goal_node = goal_node.parent
 
-    return states[::-1], actions[::-1]
+    return states, actions
 
 
 class SearchEngine:
@@ -29,6 +34,12 @@ class SearchEngine:
         self.algorithm = algorithm
         self.heuristic = heuristic
         self.metrics_only = metrics_only
+        # Resolve the algorithm's frontier methods and search variant once per engine
+        self._add = algorithm.add
+        self._get_next = algorithm.get_next
+        self._has_next = algorithm.has_next
+        self._search_loop = (self._search_with_cost_caching if algorithm.should_cache_cost()
+                             else self._search_without_cost_caching)
         if pruning is not None:
             core.pruning = bool(pruning)
 
@@ -39,69 +50,88 @@ class SearchEngine:
         if initial_state.is_goal():
             return self._create_success_from_node(start_node)
 
-        self.algorithm.add(start_node, self.heuristic)
-        self._update_frontier_size()
-
-        if self.algorithm.should_cache_cost():
-            return self._search_with_cost_caching(initial_state)
-        else:
-            return self._search_without_cost_caching(initial_state)
+        self._add(start_node, self.heuristic)
+        return self._search_loop(initial_state)
 
     def _search_with_cost_caching(self, initial_state: SokobanState) -> SearchResult:
-        best_costs: Dict[SokobanState, int] = {initial_state: 0}
-        closed_set: Set[SokobanState] = set()
-
-        while self.algorithm.has_next():
-            current_node = self.algorithm.get_next()
-            if current_node.cost > best_costs.get(current_node.state, float("inf")):
+        # Best g keyed by Zobrist hash: int probes instead of state __hash__/__eq__.
+        # No separate closed set: a popped node whose g is worse than the best known is
+        # stale and skipped (lazy deletion), and a node is only pushed when it improves g.
+        best_costs: Dict[int, int] = {initial_state.zhash: 0}
+
+        # Hot loop: bind attribute lookups once
+        has_next = self._has_next
+        get_next = self._get_next
+        add = self._add
+        heuristic = self.heuristic
+        get_best = best_costs.get
+        inf = float("inf")
+        expanded = 0
+
+        while has_next():
+            current_node = get_next()
+            current_hash = current_node.state.zhash
+            if current_node.cost > get_best(current_hash, inf):
                 continue
 
-            closed_set.add(current_node.state)
             if current_node.state.is_goal():
+                self.nodes_expanded = expanded
                 return self._create_success_from_node(current_node)
 
-            self.nodes_expanded += 1
+            expanded += 1
 
-            for successor_node in current_node.get_successors():
-                state = successor_node.state
-                g = successor_node.cost
-                if g >= best_costs.get(state, float("inf")):
+            # Goal is tested on expansion: testing on generation would break A* optimality.
+            # Nodes are only built for successors that improve g; the rest never allocate one.
+            g = current_node.cost + 1
+            for successor_state, action_name, _ in current_node.state.get_successors():
+                zhash = successor_state.zhash
+                if g >= get_best(zhash, inf):
                     continue
 
-                best_costs[state] = g
-                successor_node.parent = current_node
-                if state in closed_set:
-                    closed_set.remove(state)
+                best_costs[zhash] = g
 
-                self.algorithm.add(successor_node, self.heuristic)
-                self._update_frontier_size()
+                add(StateNode(successor_state, parent=current_node, action=action_name), heuristic)
 
+        self.nodes_expanded = expanded
         return self._create_failure()
 
     def _search_without_cost_caching(self, initial_state: SokobanState) -> SearchResult:
-        closed_states: Set[SokobanState] = {initial_state}
-
-        while self.algorithm.has_next():
-            current_node = self.algorithm.get_next()
+        # Closed set of Zobrist hashes: int probes instead of state __eq__
+        closed_states: Set[int] = {initial_state.zhash}
+
+        # Hot loop: bind attribute lookups once
+        has_next = self._has_next
+        get_next = self._get_next
+        add = self._add
+        heuristic = self.heuristic
+        close = closed_states.add
+        expanded = 0
+
+        while has_next():
+            current_node = get_next()
             if current_node.state.is_goal():
+                self.nodes_expanded = expanded
                 return self._create_success_from_node(current_node)
 
-            self.nodes_expanded += 1
+            expanded += 1
 
-            for successor_node in current_node.get_successors():
-                state = successor_node.state
-                if state in closed_states:
+            # Closed successors are skipped before a StateNode is built for them
+            for successor_state, action_name, is_goal in current_node.state.get_successors():
+                zhash = successor_state.zhash
+                if zhash in closed_states:
                     continue
 
-                closed_states.add(state)
-                successor_node.parent = current_node
-                self.algorithm.add(successor_node, self.heuristic)
-                self._update_frontier_size()
+                successor_node = StateNode(successor_state, parent=current_node, action=action_name)
+                # Goal found while generating: return it without a frontier round trip
+                if is_goal:
+                    self.nodes_expanded = expanded
+                    return self._create_success_from_node(successor_node)
 
-        return self._create_failure()
+                close(zhash)
+                add(successor_node, heuristic)
 
-    def _update_frontier_size(self) -> None:
-        self.max_frontier_size = max(self.max_frontier_size, self.algorithm.size())
+        self.nodes_expanded = expanded
+        return self._create_failure()
 
     def _create_success_from_node(self, node: StateNode) -> SearchResult:
         if self.metrics_only:
@@ -113,17 +143,22 @@ class SearchEngine:
             return self._create_success(states, actions)
 
     def _init_metrics(self) -> None:
-        self.start_time = time.time()
+        self.start_ns = time.perf_counter_ns()
         self.nodes_expanded = 0
-        self.max_frontier_size = 0
+        # Pooled algorithms outlive a single search: start from an empty frontier and a zero peak size
+        self.algorithm.reset()
+
+    def _elapsed_seconds(self) -> float:
+        # Monotonic int clock; converted to seconds only when the result is built
+        return (time.perf_counter_ns() - self.start_ns) / 1e9
 
     def _create_success(self, states: List[SokobanState], actions: List[str]) -> SearchResult:
         return SearchResult.create_success(
             states,
             actions,
             self.nodes_expanded,
-            self.max_frontier_size,
-            time.time() - self.start_time,
+            self.algorithm.max_size,
+            self._elapsed_seconds(),
             self.algorithm.get_algorithm_type(),
         )
 
@@ -131,15 +166,15 @@ class SearchEngine:
         return SearchResult.create_success_metrics_only(
             solution_cost,
             self.nodes_expanded,
-            self.max_frontier_size,
-            time.time() - self.start_time,
+            self.algorithm.max_size,
+            self._elapsed_seconds(),
             self.algorithm.get_algorithm_type(),
         )
 
     def _create_failure(self) -> SearchResult:
         return SearchResult.create_failure(
             self.nodes_expanded,
-            self.max_frontier_size,
-            time.time() - self.start_time,
+            self.algorithm.max_size,
+            self._elapsed_seconds(),
             self.algorithm.get_algorithm_type(),
         )
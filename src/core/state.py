@@ -1,7 +1,10 @@
-from typing import Iterable, Tuple
+import random
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from enum import Enum
+import numpy as np
 import src.core as core
-from src.heuristics.deadlock import DeadlockDetector
+from src.heuristics.deadlock import get_dead_cells, get_square_masks
 
 
 class Action(Enum):
@@ -11,68 +14,242 @@ class Action(Enum):
     RIGHT = "RIGHT"
     PUSH = "PUSH"
 
+# (dr, dc, action) per direction, in expansion order
+_DIRS = ((-1, 0, Action.UP), (1, 0, Action.DOWN), (0, -1, Action.LEFT), (0, 1, Action.RIGHT))
+
+# Zobrist keys: one random 64-bit int per (cell, role), generated on first use.
+# The state hash is the XOR of the player key and every box key, so a move
+# updates it with 2 (walk) or 4 (push) XORs instead of rehashing all boxes.
+_zobrist_rng = random.Random(0x5EED)
+_Z_PLAYER: Dict[Tuple[int, int], int] = {}
+_Z_BOX: Dict[Tuple[int, int], int] = {}
+
+
+def _zkey(table: Dict[Tuple[int, int], int], pos: Tuple[int, int]) -> int:
+    key = table.get(pos)
+    if key is None:
+        key = table[pos] = _zobrist_rng.getrandbits(64)
+    return key
+
+
+class Board:
+    """Static data of one puzzle (walls + goals), shared by all of its states.
+
+    States only hold the player cell, the box bitboard and a pointer to their
+    Board; use Board.for_level to get the shared instance of a level.
+
+    Cells get an index the first time they are seen, so boxes can be stored
+    as an int bitboard (bit i = cell i) and the player as a plain int without
+    knowing the map size. Moves from each cell are precomputed lazily:
+    (new_player_cell, action_name, new_bit, push_bit, push_squares, z_player_delta,
+    z_box_delta) for every direction that does not walk into a wall;
+    push_bit is 0 when the cell behind is a wall, and push_squares holds the
+    2x2 freeze masks around the push target. dead_mask has a bit
+    set for every cell that deadlocks any box pushed onto it (see
+    src.heuristics.deadlock.get_dead_cells). goals_arr and coords() give the
+    numeric (N, 2) int32 layout the heuristics work on.
+    """
+    __slots__ = ('walls', 'goals', 'goals_bb', 'goals_arr', 'dead_mask', '_index', '_cells', '_moves')
+
+    def __init__(self, walls: frozenset[Tuple[int, int]], goals: frozenset[Tuple[int, int]]):
+        self.walls = walls
+        self.goals = goals
+        self._index: Dict[Tuple[int, int], int] = {}
+        self._cells: List[Tuple[int, int]] = []
+        self._moves: List[Optional[tuple]] = []  # by cell index
+        self.goals_bb = self.encode(goals)
+        self.goals_arr = self.coords(self.goals_bb)
+        self.dead_mask = self.encode(get_dead_cells(walls, goals))
+
+    @classmethod
+    def for_level(cls, walls: frozenset[Tuple[int, int]], goals: frozenset[Tuple[int, int]]) -> 'Board':
+        """Shared Board for (walls, goals), built on first use"""
+        key = (walls, goals)
+        board = _BOARDS.get(key)
+        if board is None:
+            board = _BOARDS[key] = cls(walls, goals)
+        return board
+
+    def index(self, pos: Tuple[int, int]) -> int:
+        """Cell index for pos, assigning a new one on first use"""
+        index = self._index.get(pos)
+        if index is None:
+            index = self._index[pos] = len(self._cells)
+            self._cells.append(pos)
+            self._moves.append(None)
+        return index
+
+    def bit(self, pos: Tuple[int, int]) -> int:
+        """Bit for pos, assigning it a new index on first use"""
+        return 1 << self.index(pos)
+
+    def cell(self, index: int) -> Tuple[int, int]:
+        return self._cells[index]
+
+    def encode(self, positions: Iterable[Tuple[int, int]]) -> int:
+        bb = 0
+        for pos in positions:
+            bb |= self.bit(pos)
+        return bb
+
+    def decode(self, bb: int) -> frozenset[Tuple[int, int]]:
+        return frozenset(self.iter_cells(bb))
+
+    def iter_cells(self, bb: int) -> Iterator[Tuple[int, int]]:
+        """Positions of the set bits, lowest index first"""
+        cells = self._cells
+        while bb:
+            low = bb & -bb
+            yield cells[low.bit_length() - 1]
+            bb ^= low
+
+    def coords(self, bb: int) -> np.ndarray:
+        """(row, col) of the set bits as an (N, 2) int32 array, lowest index first"""
+        return np.fromiter(chain.from_iterable(self.iter_cells(bb)), dtype=np.int32,
+                           count=2 * bb.bit_count()).reshape(-1, 2)
+
+    def moves(self, cell: int) -> tuple:
+        entry = self._moves[cell]
+        if entry is None:
+            entry = self._moves[cell] = self._build_moves(self._cells[cell])
+        return entry
+
+    def _build_moves(self, pos: Tuple[int, int]) -> tuple:
+        walls = self.walls
+        moves = []
+        for dr, dc, action in _DIRS:
+            new_pos = (pos[0] + dr, pos[1] + dc)
+            if new_pos in walls:
+                continue
+            push_target = (new_pos[0] + dr, new_pos[1] + dc)
+            new_cell = self.index(new_pos)
+            new_bit = 1 << new_cell
+            if push_target in walls:
+                push_bit, push_squares, z_box_delta = 0, (), 0
+            else:
+                push_bit = self.bit(push_target)
+                push_squares = get_square_masks(push_target, self.bit, walls, self.goals)
+                z_box_delta = _zkey(_Z_BOX, new_pos) ^ _zkey(_Z_BOX, push_target)
+            z_player_delta = _zkey(_Z_PLAYER, pos) ^ _zkey(_Z_PLAYER, new_pos)
+            # Action name (its .value) stored once here, not looked up per successor
+            moves.append((new_cell, action.value, new_bit, push_bit, push_squares, z_player_delta, z_box_delta))
+        return tuple(moves)
+
+
+_BOARDS: Dict[Tuple[frozenset[Tuple[int, int]], frozenset[Tuple[int, int]]], Board] = {}
+
+
 class SokobanState:
     __slots__ = (
-        'player_pos', 'boxes', 'walls', 'goals', '_hash', '_is_goal_cache',
+        'player_cell', 'boxes_bb', 'board', '_zhash',
     )
 
     def __init__(self, player_pos: Tuple[int, int],
                  boxes: Iterable[Tuple[int, int]],
-                 walls: frozenset[Tuple[int, int]],
-                 goals: frozenset[Tuple[int, int]]):
-        self.player_pos = player_pos
-        self.boxes = frozenset(boxes)  # immutable for hashing
-        self.walls = walls
-        self.goals = goals
-        self._hash = None
-        self._is_goal_cache = None
+                 board: Board):
+        if type(boxes) is not frozenset:
+            boxes = frozenset(boxes)  # dedupe so the XOR hash matches the bitboard
+        zhash = _zkey(_Z_PLAYER, player_pos)
+        for box in boxes:
+            zhash ^= _zkey(_Z_BOX, box)
+        self.player_cell = board.index(player_pos)  # cell index, see Board
+        self.boxes_bb = board.encode(boxes)  # bit per box cell, see Board
+        self.board = board
+        self._zhash = zhash
+
+    # walls/goals live once on the shared Board instead of in every state
+    @property
+    def walls(self) -> frozenset[Tuple[int, int]]:
+        return self.board.walls
+
+    @property
+    def goals(self) -> frozenset[Tuple[int, int]]:
+        return self.board.goals
+
+    @property
+    def player_pos(self) -> Tuple[int, int]:
+        return self.board.cell(self.player_cell)
+
+    @property
+    def boxes(self) -> frozenset[Tuple[int, int]]:
+        return self.board.decode(self.boxes_bb)
+
+    def boxes_iter(self) -> Iterator[Tuple[int, int]]:
+        """Box positions straight from the bitboard, without building a frozenset"""
+        return self.board.iter_cells(self.boxes_bb)
+
+    @property
+    def boxes_arr(self) -> np.ndarray:
+        """Box positions as an (N, 2) int32 array, built from the bitboard"""
+        return self.board.coords(self.boxes_bb)
 
     def __eq__(self, other):
         if not isinstance(other, SokobanState):
             return False
-        return (self.player_pos == other.player_pos and 
-                self.boxes == other.boxes)
+        return (self.player_cell == other.player_cell and 
+                self.boxes_bb == other.boxes_bb and
+                self.board is other.board)
     
     def __hash__(self):
-        if self._hash is None:
-            self._hash = hash((self.player_pos, self.boxes))
-        return self._hash
+        return self._zhash
+
+    @property
+    def zhash(self) -> int:
+        """Zobrist hash of (player_pos, boxes); equal states always share it"""
+        return self._zhash
 
     def is_goal(self) -> bool:
-        if self._is_goal_cache is None:
-            self._is_goal_cache = self.boxes == self.goals
-        return self._is_goal_cache
-
-    def get_successors(self) -> Iterable[Tuple['SokobanState', Action]]:
-        directions = [(-1, 0, Action.UP), (1, 0, Action.DOWN), (0, -1, Action.LEFT), (0, 1, Action.RIGHT)]
-
-        for dr, dc, action in directions:
-            new_player_pos = (self.player_pos[0] + dr, self.player_pos[1] + dc)
-            
-            # invalid if hits wall
-            if new_player_pos in self.walls:
-                continue
-            
-            boxes = self.boxes
+        return self.boxes_bb == self.board.goals_bb
 
-            # Si hay una caja en la nueva posición del jugador
-            if new_player_pos in self.boxes:
-                new_box_pos = (new_player_pos[0] + dr, new_player_pos[1] + dc)
-                
-                if new_box_pos in self.walls or new_box_pos in self.boxes:
-                    continue
+    def get_successors(self) -> Tuple[Tuple['SokobanState', str, bool], ...]:
+        """(state, action name, is_goal) per successor; the goal flag is computed while generating"""
+        board = self.board
+        boxes_bb = self.boxes_bb
+        goals_bb = board.goals_bb
+        pruning = core.pruning
+        dead_mask = board.dead_mask
+        zhash = self._zhash
+        # Walking leaves the boxes untouched: same goal status as this state
+        walk_is_goal = boxes_bb == goals_bb
+        # Successors share the board and skip encoding/hashing: fill the slots directly
+        new_state = object.__new__
+        cls = SokobanState
+        successors = []
+        append = successors.append
 
-                new_boxes = set(self.boxes)
-                new_boxes.remove(new_player_pos)
-                new_boxes.add(new_box_pos)
-                temp_boxes = frozenset(new_boxes)
-                if core.pruning and DeadlockDetector.is_deadlock(new_box_pos, temp_boxes, self.walls, self.goals):
+        # Wall checks, box bits and Zobrist deltas are precomputed per cell in the board
+        for new_player_cell, action_name, new_bit, push_bit, push_squares, z_player_delta, z_box_delta in board.moves(self.player_cell):
+            # Si hay una caja en la nueva posición del jugador
+            if boxes_bb & new_bit:
+                if not push_bit or boxes_bb & push_bit:
                     continue
 
-                # New boxes instance only in case of push
-                boxes = temp_boxes
+                # Push: two bit flips move the box
+                new_boxes_bb = boxes_bb ^ new_bit ^ push_bit
+                if pruning:
+                    # Static dead cells are one bit test; only the 2x2 freeze check depends on the other boxes
+                    if push_bit & dead_mask:
+                        continue
+                    frozen = False
+                    for mask in push_squares:
+                        if new_boxes_bb & mask == mask:
+                            frozen = True
+                            break
+                    if frozen:
+                        continue
 
-            new_state = SokobanState(new_player_pos, boxes, self.walls, self.goals)
-            yield new_state, action
+                new_hash = zhash ^ z_player_delta ^ z_box_delta
+                is_goal = new_boxes_bb == goals_bb
+            else:
+                new_boxes_bb = boxes_bb
+                new_hash = zhash ^ z_player_delta
+                is_goal = walk_is_goal
 
+            state = new_state(cls)
+            state.player_cell = new_player_cell
+            state.boxes_bb = new_boxes_bb
+            state.board = board
+            state._zhash = new_hash
+            append((state, action_name, is_goal))
 
+        return tuple(successors)
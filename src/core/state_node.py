@@ -1,4 +1,4 @@
-from typing import Optional, Iterable
+from typing import Optional
 from src.core.state import SokobanState
 
 
@@ -11,14 +11,3 @@ class StateNode:
         self.action = action
         self.cost = 0 if parent is None else parent.cost + 1
         self.depth = 0 if parent is None else parent.depth + 1
-
-    def __hash__(self):
-        return self.state.__hash__()
-
-    def __eq__(self, other):
-        return self.state.__eq__(other.state) if isinstance(other, StateNode) else False
-
-    def get_successors(self) -> Iterable["StateNode"]:
-        # Generator avoids building an intermediate list.
-        for successor_state, action in self.state.get_successors():
-            yield StateNode(successor_state, parent=self, action=action.value)
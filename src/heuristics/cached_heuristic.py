@@ -0,0 +1,51 @@
+from abc import abstractmethod
+from typing import Dict, Optional, TYPE_CHECKING
+from src.core.interfaces import IHeuristic, H_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from src.core.state import Board, SokobanState
+
+
+class CachedHeuristic(IHeuristic):
+    """Base de las heurísticas que sólo dependen de las cajas: memoriza h por una clave
+    de cajas (un bitboard) dentro de un tablero. Las subclases definen _key y _compute,
+    y _on_board si preparan tablas propias del tablero."""
+
+    def __init__(self):
+        self._cache: Dict[int, int] = {}
+        self._board: Optional['Board'] = None
+
+    def calculate(self, state: 'SokobanState') -> int:
+        board = state.board
+        if board is not self._board:
+            self.reset()
+            self._board = board
+            self._on_board(board)
+        key = self._key(state)
+        cache = self._cache
+        h = cache.get(key)
+        if h is None:
+            # Al llegar al tope se vacía de una vez: desalojar de a una entrada desde el frente
+            # del dict recorre los huecos ya borrados y se vuelve cuadrático
+            if len(cache) >= H_CACHE_SIZE:
+                cache.clear()
+            h = cache[key] = self._compute(state, key)
+        return h
+
+    def reset(self) -> None:
+        self._cache.clear()
+        self._board = None
+
+    def _on_board(self, board: 'Board') -> None:
+        """Se llama al empezar a evaluar estados de un tablero nuevo"""
+        return
+
+    @abstractmethod
+    def _key(self, state: 'SokobanState') -> int:
+        """Clave de cajas de las que depende h"""
+        raise NotImplementedError("This method should be overridden")
+
+    @abstractmethod
+    def _compute(self, state: 'SokobanState', key: int) -> int:
+        """Valor de h para una clave que no está en el cache"""
+        raise NotImplementedError("This method should be overridden")
\ No newline at end of file
@@ -1,243 +1,193 @@
-from src.core.interfaces import IHeuristic
-from typing import Tuple, Set, Dict, TYPE_CHECKING
+from src.core.interfaces import DEAD
+from src.heuristics.cached_heuristic import CachedHeuristic
+from typing import Callable, Tuple, Set, Dict, TYPE_CHECKING
 import numpy as np
+from scipy.optimize import linear_sum_assignment
 
 if TYPE_CHECKING:
-    from src.core.state import SokobanState
-
-
-class DeadlockDetector(IHeuristic):
-    """Applies Manhattan distance heuristic plus detects and prunes deadlocks."""
-    # Cache of aisle-end pruning per (walls, goals)
-    _aisle_cache: Dict[tuple[frozenset[Tuple[int, int]], frozenset[Tuple[int, int]]], frozenset[Tuple[int, int]]] = {}
-
-    def calculate(self, state: 'SokobanState') -> int:
-        h = 0
-        boxes = np.array(list(state.boxes))
-        goals = np.array(list(state.goals))
-        for box in boxes:
-            dist = np.abs(goals - box).sum(axis=1)
-            h = h + dist.min()
-        for box in state.boxes:
-            if self.is_deadlock(box, state.boxes, state.walls, state.goals):
-                h = np.inf
-                break
-        return h
-
-    @staticmethod
-    def is_deadlock(
-            box_pos: Tuple[int, int],
-            boxes: frozenset[Tuple[int, int]],
-            walls: frozenset[Tuple[int, int]],
-            goals: frozenset[Tuple[int, int]],
-    ) -> bool:
-        """Detecta si una caja está en deadlock"""
-        if DeadlockDetector._is_corner_deadlock(box_pos, walls, goals):
-            return True
-        if DeadlockDetector._is_square_deadlock(box_pos, boxes, goals):
-            return True
-        # Removed over-aggressive between-corners-without-door rule
-        # if DeadlockDetector._is_between_corners_no_door(box_pos, walls, goals):
-        #     return True
-        if DeadlockDetector._is_aisle_end_cell(box_pos, walls, goals) and box_pos not in goals:
-            return True
-        return False
-
-    @staticmethod
-    def _is_corner_deadlock(
-            pos: Tuple[int, int],
-            walls: frozenset[Tuple[int, int]],
-            goals: frozenset[Tuple[int, int]]
-    ) -> bool:
-        """Verifica si la posición es una esquina sin goal"""
-        if pos in goals:
-            return False
-
-        r, c = pos
-        corner_patterns = [
-            [(r - 1, c), (r, c - 1)],  # Superior izquierda
-            [(r - 1, c), (r, c + 1)],  # Superior derecha
-            [(r + 1, c), (r, c - 1)],  # Inferior izquierda
-            [(r + 1, c), (r, c + 1)],  # Inferior derecha
-        ]
-        return any(all(wp in walls for wp in pattern) for pattern in corner_patterns)
-
-    @staticmethod
-    def _is_square_deadlock(
-            pos: Tuple[int, int],
-            boxes: frozenset[Tuple[int, int]],
-            goals: frozenset[Tuple[int, int]]
-    ) -> bool:
-        """Detecta cuadrados 2x2 de cajas sin goals"""
-        r, c = pos
-        squares = [
-            [(r, c), (r, c + 1), (r + 1, c), (r + 1, c + 1)],       # pos en superior izquierda
-            [(r - 1, c - 1), (r - 1, c), (r, c - 1), (r, c)],       # pos en inferior derecha
-            [(r - 1, c), (r - 1, c + 1), (r, c), (r, c + 1)],       # pos en inferior izquierda
-            [(r, c - 1), (r, c), (r + 1, c - 1), (r + 1, c)],       # pos en superior derecha
-        ]
-        for square in squares:
-            if all(p in boxes for p in square) and not any(p in goals for p in square):
-                return True
-        return False
-
-    @staticmethod
-    def _has_clear_horizontal_path(
-            start: Tuple[int, int],
-            end: Tuple[int, int],
-            walls: frozenset[Tuple[int, int]]
-    ) -> bool:
-        """Verifica path horizontal libre"""
-        r = start[0]
-        start_c, end_c = sorted([start[1], end[1]])
-        for c in range(start_c, end_c + 1):
-            if (r, c) in walls:
-                return False
-        return True
-
-    @staticmethod
-    def _has_clear_vertical_path(
-            start: Tuple[int, int],
-            end: Tuple[int, int],
-            walls: frozenset[Tuple[int, int]],
-    ) -> bool:
-        """Verifica path vertical libre"""
-        c = start[1]
-        start_r, end_r = sorted([start[0], end[0]])
-        for r in range(start_r, end_r + 1):
-            if (r, c) in walls:
-                return False
+    from src.core.state import Board, SokobanState
+
+# Los cuatro cuadrados 2x2 que contienen a la caja, como offsets desde ella
+_SQUARE_OFFSETS = (
+    ((0, 0), (0, 1), (1, 0), (1, 1)),        # pos en superior izquierda
+    ((-1, -1), (-1, 0), (0, -1), (0, 0)),    # pos en inferior derecha
+    ((-1, 0), (-1, 1), (0, 0), (0, 1)),      # pos en inferior izquierda
+    ((0, -1), (0, 0), (1, -1), (1, 0)),      # pos en superior derecha
+)
+# Cache of aisle-end pruning per (walls, goals)
+_aisle_cache: Dict[tuple[frozenset[Tuple[int, int]], frozenset[Tuple[int, int]]], frozenset[Tuple[int, int]]] = {}
+# Cache of static dead cells (corners + aisle ends, sin goals) per (walls, goals)
+_dead_cells_cache: Dict[tuple[frozenset[Tuple[int, int]], frozenset[Tuple[int, int]]], frozenset[Tuple[int, int]]] = {}
+
+
+class DeadlockDetector(CachedHeuristic):
+    """Applies a minimum box-goal matching (Manhattan) heuristic plus detects and prunes deadlocks."""
+
+    def __init__(self):
+        # h cacheado por bitboard completo de cajas: las cajas en goal también ocupan goals en el matching
+        super().__init__()
+        # buffers de diferencias (B, G, 2) y costos (B, G) reutilizados entre llamadas
+        self._diff_buf = np.empty((0, 0, 2), dtype=np.int32)
+        self._cost_buf = np.empty((0, 0), dtype=np.int32)
+
+    def reset(self) -> None:
+        super().reset()
+        self._diff_buf = np.empty((0, 0, 2), dtype=np.int32)
+        self._cost_buf = np.empty((0, 0), dtype=np.int32)
+
+    def _key(self, state: 'SokobanState') -> int:
+        return state.boxes_bb
+
+    def _compute(self, state: 'SokobanState', boxes_bb: int) -> int:
+        board = state.board
+        if is_boxes_deadlock(board, boxes_bb):
+            return DEAD
+
+        boxes_np = state.boxes_arr
+        goals_np = board.goals_arr
+        n = len(boxes_np)
+        if n > len(self._cost_buf):
+            self._diff_buf = np.empty((n, len(goals_np), 2), dtype=np.int32)
+            self._cost_buf = np.empty((n, len(goals_np)), dtype=np.int32)
+        # (B, G) distancias Manhattan en un solo broadcast, sobre los buffers. La asignación de costo mínimo
+        # (cada goal a una sola caja) sigue siendo admisible y acota mejor que el goal más cercano por caja
+        diff = self._diff_buf[:n]
+        cost = self._cost_buf[:n]
+        np.subtract(boxes_np[:, None, :], goals_np[None, :, :], out=diff)
+        np.abs(diff, out=diff)
+        np.add(diff[..., 0], diff[..., 1], out=cost)
+        rows, cols = linear_sum_assignment(cost)
+        return int(cost[rows, cols].sum())
+
+
+def is_boxes_deadlock(board: 'Board', boxes_bb: int) -> bool:
+    """Detecta si un bitboard de cajas tiene alguna caja en deadlock (celda muerta o cuadrado 2x2).
+    Las cajas en goal no cambian el resultado: las celdas muertas y los cuadrados considerados no tienen goals"""
+    # Esquinas y fondos de pasillo: un AND contra la máscara estática del tablero
+    if boxes_bb & board.dead_mask:
         return True
-
-    @staticmethod
-    def _bounds(walls: frozenset[Tuple[int, int]], goals: frozenset[Tuple[int, int]]):
-        points = list(walls) + list(goals)
-        if not points:
-            return 0, 0, 0, 0
-        rs = [p[0] for p in points]
-        cs = [p[1] for p in points]
-        return min(rs), max(rs), min(cs), max(cs)
-
-    @staticmethod
-    def _is_between_corners_no_door(
-            pos: Tuple[int, int],
-            walls: frozenset[Tuple[int, int]],
-            goals: frozenset[Tuple[int, int]],
-    ) -> bool:
-        """
-        Checks if a box is against a continuous wall (without a "door") and between two corners.
-        If no goals are present in the segment, the position is a deadlock.
-        """
-        r, c = pos
-        min_r, max_r, min_c, max_c = DeadlockDetector._bounds(walls, goals)
-
-        # Horizontal scan (top/bottom wall)
-        def row_segment_no_door(row: int, col_start: int, wall_row_offset: int) -> bool:
-            left = col_start
-            while (row + wall_row_offset, left) in walls:
-                if (row, left - 1) in walls:
-                    break
-                left -= 1
-                if left < min_c - 2:
-                    return False
-
-            right = col_start
-            while (row + wall_row_offset, right) in walls:
-                if (row, right + 1) in walls:
-                    break
-                right += 1
-                if right > max_c + 2:
-                    return False
-
-            return all((row, cc) not in goals for cc in range(left, right + 1))
-
-        # Vertical scan (left/right wall); requires no "door" along the side wall.
-        def col_segment_doorless(col: int, row_start: int, adj_col_delta: int) -> bool:
-            up = row_start
-            while True:
-                if (up, col + adj_col_delta) not in walls:
-                    return False # door found
-                if (up - 1, col) in walls:
-                    break  # superior corner
-                up -= 1
-                if up < min_r - 2:
-                    return False
-
-            down = row_start
-            while True:
-                if (down, col + adj_col_delta) not in walls:
-                    return False
-                if (down + 1, col) in walls:
-                    break  # inferior corner
-                down += 1
-                if down > max_r + 2:
-                    return False
-
-            for rr in range(up, down + 1):
-                if (rr, col) in goals:
-                    return False # goal found
-
+    boxes = board.decode(boxes_bb)
+    goals = board.goals
+    for box in boxes:
+        if _is_square_deadlock(box, boxes, goals):
             return True
+    return False
+
+
+def get_dead_cells(
+        walls: frozenset[Tuple[int, int]],
+        goals: frozenset[Tuple[int, int]],
+) -> frozenset[Tuple[int, int]]:
+    """Celdas donde toda caja queda en deadlock sin importar las demás: esquinas y fondos de pasillo sin goal"""
+    key = (walls, goals)
+    cached = _dead_cells_cache.get(key)
+    if cached is not None:
+        return cached
+
+    dead: Set[Tuple[int, int]] = set(_get_aisle_pruned_cells(walls, goals))
+    min_r, max_r, min_c, max_c = _bounds(walls, goals)
+    for r in range(min_r, max_r + 1):
+        for c in range(min_c, max_c + 1):
+            if (r, c) not in walls and _is_corner_deadlock((r, c), walls, goals):
+                dead.add((r, c))
+
+    result = frozenset(dead)
+    _dead_cells_cache[key] = result
+    return result
+
+
+def _is_corner_deadlock(
+        pos: Tuple[int, int],
+        walls: frozenset[Tuple[int, int]],
+        goals: frozenset[Tuple[int, int]]
+) -> bool:
+    """Verifica si la posición es una esquina sin goal"""
+    if pos in goals:
+        return False
 
-        if (r - 1, c) in walls and row_segment_no_door(r, c, -1):
-            return True
-        if (r + 1, c) in walls and row_segment_no_door(r, c, +1):
+    r, c = pos
+    # Las 4 esquinas (arriba|abajo) x (izquierda|derecha) se reducen a 4 consultas de vecinos
+    vertical = (r - 1, c) in walls or (r + 1, c) in walls
+    return vertical and ((r, c - 1) in walls or (r, c + 1) in walls)
+
+
+def _is_square_deadlock(
+        pos: Tuple[int, int],
+        boxes: frozenset[Tuple[int, int]],
+        goals: frozenset[Tuple[int, int]]
+) -> bool:
+    """Detecta cuadrados 2x2 de cajas sin goals"""
+    r, c = pos
+    squares = [[(r + dr, c + dc) for dr, dc in offsets] for offsets in _SQUARE_OFFSETS]
+    for square in squares:
+        if all(p in boxes for p in square) and not any(p in goals for p in square):
             return True
-        if (r, c - 1) in walls and col_segment_doorless(c, r, -1):
+    return False
+
+
+def get_square_masks(
+        pos: Tuple[int, int],
+        box_bit: Callable[[Tuple[int, int]], int],
+        walls: frozenset[Tuple[int, int]],
+        goals: frozenset[Tuple[int, int]],
+) -> Tuple[int, ...]:
+    """Máscaras de los cuadrados 2x2 sin goals que contienen pos, con un bit (box_bit) por celda que no es pared.
+    Las paredes cuentan como ocupadas: con las cajas como bitboard, el cuadrado está congelado si boxes_bb & m == m"""
+    r, c = pos
+    squares = [[(r + dr, c + dc) for dr, dc in offsets] for offsets in _SQUARE_OFFSETS]
+    masks = []
+    for square in squares:
+        if any(p in goals for p in square):
+            continue
+        mask = 0
+        for p in square:
+            if p not in walls:
+                mask |= box_bit(p)
+        masks.append(mask)
+    return tuple(masks)
+
+
+def _bounds(walls: frozenset[Tuple[int, int]], goals: frozenset[Tuple[int, int]]) -> Tuple[int, int, int, int]:
+    """(min_r, max_r, min_c, max_c) de walls y goals; (0, 0, 0, 0) si no hay ninguno"""
+    points = list(walls) + list(goals)
+    if not points:
+        return 0, 0, 0, 0
+    rs = [p[0] for p in points]
+    cs = [p[1] for p in points]
+    return min(rs), max(rs), min(cs), max(cs)
+
+
+def _get_aisle_pruned_cells(
+        walls: frozenset[Tuple[int, int]],
+        goals: frozenset[Tuple[int, int]],
+) -> frozenset[Tuple[int, int]]:
+    """Identify cells that are true dead-end sinks (3+ surrounding walls), excluding goals.
+    This safer local rule avoids over-pruning whole corridors that may be required to reach goals.
+    """
+    key = (walls, goals)
+    cached = _aisle_cache.get(key)
+    if cached is not None:
+        return cached
+
+    min_r, max_r, min_c, max_c = _bounds(walls, goals)
+
+    def is_wall(rr: int, cc: int) -> bool:
+        # treat out-of-bounds as walls to be conservative
+        if rr < min_r or rr > max_r or cc < min_c or cc > max_c:
             return True
-        if (r, c + 1) in walls and col_segment_doorless(c, r, +1):
-            return True
-
-        return False
-
-    @staticmethod
-    def _is_aisle_end_cell(
-            pos: Tuple[int, int],
-            walls: frozenset[Tuple[int, int]],
-            goals: frozenset[Tuple[int, int]],
-    ) -> bool:
-        pruned = DeadlockDetector._get_aisle_pruned_cells(walls, goals)
-        return pos in pruned
-
-    @staticmethod
-    def _get_aisle_pruned_cells(
-            walls: frozenset[Tuple[int, int]],
-            goals: frozenset[Tuple[int, int]],
-    ) -> frozenset[Tuple[int, int]]:
-        """Identify cells that are true dead-end sinks (3+ surrounding walls), excluding goals.
-        This safer local rule avoids over-pruning whole corridors that may be required to reach goals.
-        """
-        key = (walls, goals)
-        cached = DeadlockDetector._aisle_cache.get(key)
-        if cached is not None:
-            return cached
-
-        # Determine bounding box from walls/goals
-        rs = [p[0] for p in walls] + [p[0] for p in goals]
-        cs = [p[1] for p in walls] + [p[1] for p in goals]
-        if rs and cs:
-            min_r, max_r = min(rs), max(rs)
-            min_c, max_c = min(cs), max(cs)
-        else:
-            min_r = max_r = min_c = max_c = 0
-
-        def is_wall(rr: int, cc: int) -> bool:
-            # treat out-of-bounds as walls to be conservative
-            if rr < min_r or rr > max_r or cc < min_c or cc > max_c:
-                return True
-            return (rr, cc) in walls
-
-        pruned: Set[Tuple[int, int]] = set()
-        dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # up, down, left, right
-
-        for r in range(min_r, max_r + 1):
-            for c in range(min_c, max_c + 1):
-                if (r, c) in walls or (r, c) in goals:
-                    continue
-                count_blocked = sum(1 for dr, dc in dirs if is_wall(r + dr, c + dc))
-                if count_blocked >= 3:
-                    pruned.add((r, c))
-
-        result = frozenset(pruned)
-        DeadlockDetector._aisle_cache[key] = result
-        return result
+        return (rr, cc) in walls
+
+    pruned: Set[Tuple[int, int]] = set()
+    dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # up, down, left, right
+
+    for r in range(min_r, max_r + 1):
+        for c in range(min_c, max_c + 1):
+            if (r, c) in walls or (r, c) in goals:
+                continue
+            count_blocked = sum(1 for dr, dc in dirs if is_wall(r + dr, c + dc))
+            if count_blocked >= 3:
+                pruned.add((r, c))
+
+    result = frozenset(pruned)
+    _aisle_cache[key] = result
+    return result
@@ -1,9 +1,10 @@
 from enum import Enum
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 from src.core.interfaces import IHeuristic
 from .manhattan_heu import ManhattanHeuristic
 from .deadlock import DeadlockDetector
 from .perfect_match import PerfectMatch
+from .perfect_match_deadlock import PerfectMatchWithDeadlock
 from .sum_of_distance import SumOfDistanceMinimalMatchingCost
 
 
@@ -12,22 +13,34 @@ class HeuristicType(Enum):
     DEADLOCK = "DEADLOCK"
     PERFECT_MATCH = "PERFECTMATCH"
     SUM_OF_DISTANCE = "SUM_OF_DISTANCE"
+    PERFECT_MATCH_WITH_DEADLOCK = "PERFECTMATCH_DEADLOCK"
+
+
+_HEURISTIC_FACTORIES: Dict[HeuristicType, Callable[[], IHeuristic]] = {
+    HeuristicType.MANHATTAN: ManhattanHeuristic,
+    HeuristicType.DEADLOCK: DeadlockDetector,
+    HeuristicType.PERFECT_MATCH: PerfectMatch,
+    HeuristicType.SUM_OF_DISTANCE: SumOfDistanceMinimalMatchingCost,
+    HeuristicType.PERFECT_MATCH_WITH_DEADLOCK: PerfectMatchWithDeadlock,
+}
+
+# Una instancia por tipo: sus tablas y caches sobreviven entre búsquedas. Cada
+# heurística detecta el cambio de tablero por su cuenta; reset() los descarta a mano
+_INSTANCES: Dict[HeuristicType, IHeuristic] = {}
 
 
 class HeuristicMapper:
 
     @staticmethod
     def get_heuristic_by_type(heuristic_type: HeuristicType) -> IHeuristic:
-        if HeuristicType.MANHATTAN == heuristic_type:
-            return ManhattanHeuristic()
-        elif HeuristicType.DEADLOCK == heuristic_type:
-            return DeadlockDetector()
-        elif HeuristicType.PERFECT_MATCH == heuristic_type:
-            return PerfectMatch()
-        elif HeuristicType.SUM_OF_DISTANCE == heuristic_type:
-            return SumOfDistanceMinimalMatchingCost()
-        else:
-            raise ValueError(f"Heurística desconocida: {heuristic_type}")
+        heuristic = _INSTANCES.get(heuristic_type)
+        if heuristic is None:
+            try:
+                factory = _HEURISTIC_FACTORIES[heuristic_type]
+            except KeyError:
+                raise ValueError(f"Heurística desconocida: {heuristic_type}")
+            heuristic = _INSTANCES[heuristic_type] = factory()
+        return heuristic
 
     @staticmethod
     def from_string(heuristic_name: str) -> IHeuristic:
@@ -1,30 +1,51 @@
-from src.core.interfaces import IHeuristic
 from src.core.state import SokobanState
-import numpy as np
+from .cached_heuristic import CachedHeuristic
 
-class ManhattanHeuristic(IHeuristic):
+class ManhattanHeuristic(CachedHeuristic):
     """Manhattan distance heurisic fro Sokoban search algorithm
 
     Args:
         IHeuristic (_type_): _description_
     """
     def __init__(self):
-        return
-    
-    def calculate(self, state: SokobanState) -> int:
+        # h cacheado por bitboard de cajas fuera de goal (las cajas en goal suman 0)
+        super().__init__()
+        # distancia al goal más cercano indexada por índice de celda del tablero (bit i del bitboard);
+        # crece a medida que el tablero asigna índices nuevos y se descarta al cambiar de tablero
+        self._dist_by_cell: list[int] = []
+
+    def reset(self) -> None:
+        super().reset()
+        self._dist_by_cell = []
+
+    def _key(self, state: SokobanState) -> int:
+        return state.boxes_bb & ~state.board.goals_bb
+
+    def _compute(self, state: SokobanState, unplaced_bb: int) -> int:
         """Calculates the total sum of the Manhattan distance from each box to it's nearest goal.
 
         Args:
             state (SokobanState): Current map of the game.
+            unplaced_bb (int): bitboard of the boxes that are not on a goal.
 
         Returns:
             int: total sum of all Manhatan distances
         """
-        boxes = np.array(list(state.boxes))
-        goals = np.array(list(state.goals))
-        h = 0
-        for box in boxes:
-            dist = np.abs(goals-box).sum(axis=1)
-            h = h + dist.min()
-        return h
-
+        # las cajas en goal suman 0: sólo se recorren las que faltan ubicar
+        if not unplaced_bb:
+            return 0
+        dist = self._dist_by_cell
+        if unplaced_bb.bit_length() > len(dist):
+            # cada celda se calcula una sola vez, sin suponer límites del mapa
+            board = state.board
+            goals = board.goals
+            for index in range(len(dist), unplaced_bb.bit_length()):
+                r, c = board.cell(index)
+                dist.append(min(abs(r - gr) + abs(c - gc) for gr, gc in goals))
+        # O(B): se recorren los bits del bitboard sumando la distancia precalculada de cada celda
+        total = 0
+        while unplaced_bb:
+            low = unplaced_bb & -unplaced_bb
+            total += dist[low.bit_length() - 1]
+            unplaced_bb ^= low
+        return total
@@ -1,29 +1,124 @@
-from typing import Tuple
-from munkres import Munkres
-from src.core.interfaces import IHeuristic
-from src.core.state import SokobanState
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from scipy.optimize import linear_sum_assignment
+from src.core.interfaces import DEAD
+from src.core.state import Board, SokobanState
+from .cached_heuristic import CachedHeuristic
 import numpy as np
 
-class PerfectMatch(IHeuristic):
+
+def _goal_rooms(board: Board) -> Optional[Tuple[Dict[Tuple[int, int], int], List[np.ndarray]]]:
+    """Habitaciones con goals: regiones de celdas libres separadas por paredes (flood-fill desde cada goal).
+    Devuelve (habitación de cada celda, goals (G_i, 2) de cada habitación), o None si hay una sola
+    o si alguna región no está cerrada por paredes (no se puede acotar qué celdas le pertenecen)"""
+    walls = board.walls
+    cells = walls | board.goals
+    top = min(r for r, _ in cells)
+    bottom = max(r for r, _ in cells)
+    left = min(c for _, c in cells)
+    right = max(c for _, c in cells)
+    room_of: Dict[Tuple[int, int], int] = {}
+    room_goals: List[List[Tuple[int, int]]] = []
+    for goal in board.goals:
+        room = room_of.get(goal)
+        if room is None:
+            room = len(room_goals)
+            room_goals.append([])
+            room_of[goal] = room
+            queue = deque([goal])
+            while queue:
+                r, c = queue.popleft()
+                for nxt in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                    if nxt in room_of or nxt in walls:
+                        continue
+                    if not (top <= nxt[0] <= bottom and left <= nxt[1] <= right):
+                        return None  # la región se escapa del mapa: no es una habitación cerrada
+                    room_of[nxt] = room
+                    queue.append(nxt)
+        room_goals[room].append(goal)
+    if len(room_goals) == 1:
+        return None
+    return room_of, [np.array(goals, dtype=np.int32) for goals in room_goals]
+
+
+class PerfectMatch(CachedHeuristic):
     """
-    Optimal box-goal matching: Hungarian algorithm (Munkres implementation)
+    Optimal box-goal matching: Hungarian algorithm (scipy linear_sum_assignment)
     """
     def __init__(self):
-        self._munkres = Munkres()
-        return
+        # h cacheado por bitboard de cajas fuera de goal; los goals son fijos dentro de un tablero
+        super().__init__()
+        # buffers de diferencias (B, G, 2) y costos (B, G) reutilizados entre llamadas
+        self._diff_buf = np.empty((0, 0, 2), dtype=np.int32)
+        self._cost_buf = np.empty((0, 0), dtype=np.int32)
+        # habitaciones del tablero; None si todos los goals comparten una (el caso habitual)
+        self._rooms: Optional[Tuple[Dict[Tuple[int, int], int], List[np.ndarray]]] = None
 
-    def calculate(self, state: SokobanState) -> int:
-        boxes = [b for b in state.boxes if b not in state.goals]
-        goals = list(state.goals)
-        if len(boxes) == 0:
-            return 0
+    def reset(self) -> None:
+        super().reset()
+        self._diff_buf = np.empty((0, 0, 2), dtype=np.int32)
+        self._cost_buf = np.empty((0, 0), dtype=np.int32)
+        self._rooms = None
 
-        cost_matrix = [[self._minkowski(box, goal) for goal in goals] for box in boxes]
-        indexes = self._munkres.compute(cost_matrix)
+    def _on_board(self, board: Board) -> None:
+        self._rooms = _goal_rooms(board)
+
+    def _key(self, state: SokobanState) -> int:
+        return state.boxes_bb & ~state.board.goals_bb
+
+    def _compute(self, state: SokobanState, unplaced_bb: int) -> int:
+        # sólo las cajas fuera de goal; todos los goals siguen disponibles, ya que
+        # quitar los ocupados puede sobreestimar (una caja ubicada puede cederle su goal a otra)
+        if not unplaced_bb:
+            return 0
+        board = state.board
+        if self._rooms is not None:
+            return self._compute_by_room(board, unplaced_bb)
+        boxes_arr = board.coords(unplaced_bb)
+        goals_arr = board.goals_arr
+        n = len(boxes_arr)
+        if n > len(self._cost_buf):
+            self._diff_buf = np.empty((n, len(goals_arr), 2), dtype=np.int32)
+            self._cost_buf = np.empty((n, len(goals_arr)), dtype=np.int32)
+        # matriz de costos Manhattan (B, G) int32 por broadcasting, escrita sobre los buffers
+        diff = self._diff_buf[:n]
+        cost = self._cost_buf[:n]
+        np.subtract(boxes_arr[:, None, :], goals_arr[None, :, :], out=diff)
+        np.abs(diff, out=diff)
+        np.add(diff[..., 0], diff[..., 1], out=cost)
+        rows, cols = linear_sum_assignment(cost)
 
-        return sum(cost_matrix[row][col] for row, col in indexes)
+        return int(cost[rows, cols].sum())
 
-    def _minkowski(self, a: Tuple[int, int], b: Tuple[int, int]) -> float:
-        diff = np.abs(np.array(a) - np.array(b)) ** 1
+    def _compute_by_room(self, board: Board, unplaced_bb: int) -> int:
+        # una caja no puede salir de su habitación: la matriz es diagonal por bloques y
+        # cada habitación se resuelve por separado, con sus propias cajas y goals
+        room_of, room_goals = self._rooms
+        room_boxes: List[List[Tuple[int, int]]] = [[] for _ in room_goals]
+        for box in board.iter_cells(unplaced_bb):
+            room = room_of.get(box)
+            if room is None:
+                return DEAD  # habitación sin goals
+            room_boxes[room].append(box)
 
-        return np.power(diff.sum(), 1 / 1)
+        total = 0
+        for boxes, goals_arr in zip(room_boxes, room_goals):
+            if not boxes:
+                continue
+            n = len(boxes)
+            g = len(goals_arr)
+            if n > g:
+                return DEAD
+            if n > len(self._cost_buf):
+                self._diff_buf = np.empty((n, len(board.goals_arr), 2), dtype=np.int32)
+                self._cost_buf = np.empty((n, len(board.goals_arr)), dtype=np.int32)
+            # el bloque (n, g) de la habitación se escribe sobre una esquina de los mismos buffers
+            boxes_arr = np.array(boxes, dtype=np.int32)
+            diff = self._diff_buf[:n, :g]
+            cost = self._cost_buf[:n, :g]
+            np.subtract(boxes_arr[:, None, :], goals_arr[None, :, :], out=diff)
+            np.abs(diff, out=diff)
+            np.add(diff[..., 0], diff[..., 1], out=cost)
+            rows, cols = linear_sum_assignment(cost)
+            total += int(cost[rows, cols].sum())
+        return total
\ No newline at end of file
@@ -0,0 +1,16 @@
+from src.core.interfaces import DEAD
+from src.core.state import SokobanState
+from .deadlock import is_boxes_deadlock
+from .perfect_match import PerfectMatch
+
+
+class PerfectMatchWithDeadlock(PerfectMatch):
+    """
+    PerfectMatch precedido del chequeo de deadlock: los estados sin solución devuelven
+    DEAD sin llegar a resolver la asignación
+    """
+    def _compute(self, state: SokobanState, unplaced_bb: int) -> int:
+        # el deadlock sólo depende de las cajas fuera de goal, así que comparte la clave del cache
+        if is_boxes_deadlock(state.board, unplaced_bb):
+            return DEAD
+        return super()._compute(state, unplaced_bb)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from src.core.interfaces import IHeuristic
 from src.core.state import SokobanState
-from typing import List, Tuple
+from typing import Callable
 import numpy as np
 
 
@@ -14,29 +14,29 @@ class SumOfDistanceMinimalMatchingCost(IHeuristic):
 
     def __init__(self, p: int = 2):
         self.p = p
-
-    def _minkowski(self, a: Tuple[int, int], b: Tuple[int, int]) -> float:
-        diff = np.abs(np.array(a) - np.array(b)) ** self.p
-
-        return np.power(diff.sum(), 1 / self.p)
-
-    def _player_to_box(self, player: Tuple[int, int], boxes: List[Tuple[int, int]]) -> float:
-        distances = [self._minkowski(player, box) for box in boxes]
-
-        return min(distances) if distances else 0.0
-
-    def _match_boxes_goals(self, boxes: List[Tuple[int, int]], goals: List[Tuple[int, int]]) -> float:
-        K = len(boxes)
-        if K == 0:
-            return 0.0
-
-        total = sum(self._minkowski(box, goal) for box in boxes for goal in goals)
-        return total / K
+        # distancia especializada según p, elegida una sola vez
+        self._minkowski = self._minkowski_fn(p)
+
+    @staticmethod
+    def _minkowski_fn(p: int) -> Callable[[np.ndarray], np.ndarray]:
+        """Distancia de Minkowski sobre un array de diferencias (..., 2)"""
+        if p == 1:
+            return lambda diff: np.abs(diff).sum(axis=-1)
+        if p == 2:
+            return lambda diff: np.hypot(diff[..., 0], diff[..., 1])
+        inv_p = 1 / p
+        return lambda diff: (np.abs(diff) ** p).sum(axis=-1) ** inv_p
 
     def calculate(self, state: SokobanState) -> int:
-        boxes = [b for b in state.boxes if b not in state.goals]
-        goals = list(state.goals)
-        h1 = self._player_to_box(state.player_pos, boxes)
-        h2 = self._match_boxes_goals(boxes, goals)
+        board = state.board
+        boxes = board.coords(state.boxes_bb & ~board.goals_bb)
+        if len(boxes) == 0:
+            return 0
+
+        # una sola pasada: jugador -> cajas (N,) y cajas -> goals (N, G) sobre el mismo array
+        minkowski = self._minkowski
+        player = np.array(state.player_pos, dtype=np.int32)
+        h1 = minkowski(boxes - player).min()
+        h2 = minkowski(boxes[:, None, :] - board.goals_arr[None, :, :]).sum() / len(boxes)
 
         return int(h1 + h2)
\ No newline at end of file
@@ -2,14 +2,17 @@ import sys
 from ..core.config_loader import ConfigLoader
 from ..core.map_loader import MapLoader 
 
-print(" -- 🎮 SOKOBAN 🎮 --")
+__all__ = ["main"]
 
-if len(sys.argv) < 2:
-    print("Error: A configuration file is required as an argument.")
-    print("Usage: python main.py <path_to_config_file>")
-    exit(1)
 
-try:
+def main() -> int:
+    print(" -- 🎮 SOKOBAN 🎮 --")
+
+    if len(sys.argv) < 2:
+        print("Error: A configuration file is required as an argument.")
+        print("Usage: python main.py <path_to_config_file>")
+        return 1
+
     cfg = ConfigLoader(sys.argv[1])
     print(f"Loading level: {cfg.map_name}...")
     initial_state = MapLoader.load_from_file(cfg.map_name)
@@ -26,5 +29,8 @@ try:
         print(f'Goal {i} pos= {goal}')
         i = i+1
     print(f'h={est_cost}', flush=True)
-except Exception as e:
-    print(f"Unexpected error: {e}")
\ No newline at end of file
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())